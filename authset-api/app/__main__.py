@@ -0,0 +1,159 @@
+"""Command line entry point.
+
+    python -m app --serve                    # one uvicorn worker per core, shared SQLite state, warmed up
+    python -m app --serve --workers 4 --port 8080
+    python -m app --import-report            # what a worker imports at boot, and how long it takes
+    python -m app --import-report --eager    # same with LAZY_IMPORTS=false
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# runs in a fresh interpreter so nothing is imported yet; prints its timings as JSON
+_BOOT = """
+import json, sys, time
+started = time.perf_counter()
+from app.main import create_app
+imported = time.perf_counter()
+create_app()
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (done - imported) * 1000,
+    "numpy_loaded": "numpy" in sys.modules,
+}))
+"""
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) per line of `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def import_report(eager: bool, top: int) -> Dict:
+    env = {**os.environ, "LAZY_IMPORTS": "false" if eager else "true"}
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        capture_output=True, text=True, env=env, cwd=app_dir, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    rows = _parse_importtime(result.stderr)
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    return {
+        "mode": "eager" if eager else "lazy",
+        **{key: round(value, 1) if isinstance(value, float) else value for key, value in timings.items()},
+        "modules": len(rows),
+        "app_modules_ms": {
+            name: round(cumulative / 1000, 1) for name, _, cumulative in rows if name.split(".")[0] == "app"
+        },
+        "top_packages_ms": {
+            name: round(us / 1000, 1) for name, us in sorted(by_package.items(), key=lambda item: -item[1])[:top]
+        },
+        "top_modules_self_ms": {
+            name: round(self_us / 1000, 1) for name, self_us, _ in sorted(rows, key=lambda row: -row[1])[:top]
+        },
+    }
+
+
+def print_import_report(report: Dict) -> None:
+    print(
+        f"{report['mode']} boot: import {report['import_ms']:.1f}ms + create_app {report['create_app_ms']:.1f}ms, "
+        f"{report['modules']} modules, numpy loaded: {report['numpy_loaded']}"
+    )
+    for title, key in (
+        ("app modules (cumulative)", "app_modules_ms"),
+        ("packages (self time)", "top_packages_ms"),
+        ("modules (self time)", "top_modules_self_ms"),
+    ):
+        print(f"\n{title}")
+        for name, ms in report[key].items():
+            print(f"  {ms:8.1f}ms  {name}")
+
+
+def available_cores() -> int:
+    """Cores this process may run on (respects taskset/cgroup cpusets, unlike os.cpu_count)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def serve(host: str, port: int, workers: int, warmup: bool) -> None:
+    """
+    Run uvicorn with `workers` processes (0 = one per core).
+
+    Worker settings are passed through the environment, which every worker
+    inherits and which wins over `.env`: with more than one worker the state
+    moves to SQLite (in-memory stores are per process, so an intent created on
+    one worker would be unknown to the next), and each worker's risk batch pool
+    gets its share of the cores instead of one process per core each.
+    """
+    import uvicorn
+
+    from .config import get_settings
+    from .repositories import SQLitePool
+
+    settings = get_settings()
+    cores = available_cores()
+    workers = workers or cores
+    if workers > 1 and settings.storage_backend.lower() == "memory":
+        print("STORAGE_BACKEND=memory is per process; using sqlite for the workers to share state", file=sys.stderr)
+        os.environ["STORAGE_BACKEND"] = "sqlite"
+    if not settings.risk_pool_workers:
+        os.environ["RISK_POOL_WORKERS"] = str(max(1, cores // workers))
+    os.environ["WARMUP"] = "true" if warmup else "false"
+    if os.environ.get("STORAGE_BACKEND", settings.storage_backend).lower() == "sqlite":
+        SQLitePool(settings.sqlite_path, size=1).close()  # create the schema once, not in a race between workers
+    get_settings.cache_clear()  # with one worker uvicorn runs the app in this process
+
+    uvicorn.run(
+        "app.main:create_app", factory=True, host=host, port=port, workers=workers,
+        proxy_headers=True, log_level="info",
+    )
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app", description="AuthSet API utilities")
+    parser.add_argument("--serve", action="store_true", help="run the API with one uvicorn worker per core")
+    parser.add_argument("--host", default="0.0.0.0", help="with --serve")
+    parser.add_argument("--port", type=int, default=8000, help="with --serve")
+    parser.add_argument("--workers", type=int, default=None, help="with --serve: default WEB_WORKERS (0 = per core)")
+    parser.add_argument("--no-warmup", action="store_true", help="with --serve: skip WARMUP before taking traffic")
+    parser.add_argument("--import-report", action="store_true", help="time the imports of a worker boot")
+    parser.add_argument("--eager", action="store_true", help="with --import-report: LAZY_IMPORTS=false")
+    parser.add_argument("--top", type=int, default=15, help="with --import-report: rows per table")
+    parser.add_argument("--json", action="store_true", help="with --import-report: print JSON")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        if args.workers is None:
+            from .config import get_settings
+
+            args.workers = get_settings().web_workers
+        serve(args.host, args.port, args.workers, warmup=not args.no_warmup)
+        return
+    if not args.import_report:
+        parser.print_help()
+        return
+    report = import_report(args.eager, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_import_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Slider captcha served from a pool of pre-rendered challenges.
+
+A challenge is a NumPy-generated interference pattern with a notch cut at a
+random x offset, plus the matching piece on a transparent strip. The client
+drags the piece until it lines up and answers with the offset in pixels.
+Rendering and PNG encoding run in a background thread that keeps the pool
+topped up, so `/captcha/generate` only pops a ready challenge; if a login
+storm drains the pool, requests render inline instead of waiting.
+
+NumPy is imported on the first render, and the engine (with its thread) is
+created on first use, so importing this module costs nothing at worker boot.
+"""
+
+import base64
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Deque, Dict, Optional, Tuple
+
+from .config import get_settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+WIDTH, HEIGHT = 240, 120
+PIECE = 40  # side of the square piece, px
+MARGIN = 8
+LEVELS = 16  # posterised grey levels: keeps the PNGs small
+PROMPT = "Arraste o slider até alinhar o padrão."
+
+
+@lru_cache(maxsize=1)
+def _grid() -> Tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    y, x = np.mgrid[0:HEIGHT, 0:WIDTH].astype(np.float32)
+    return y, x
+
+
+@dataclass(frozen=True)
+class RenderedChallenge:
+    assets: Tuple[str, str]  # PNG data URIs: board with the notch, piece strip
+    answer: int  # x offset of the notch, px
+
+
+def _png(pixels: "np.ndarray") -> bytes:
+    """Encode uint8 grey (H, W) or grey+alpha (H, W, 2) pixels as a PNG."""
+    import numpy as np
+
+    height, width = pixels.shape[:2]
+    color_type = 0 if pixels.ndim == 2 else 4
+    rows = pixels.reshape(height, -1)
+    raw = np.zeros((height, rows.shape[1] + 1), dtype=np.uint8)  # leading 0: no row filter
+    raw[:, 1:] = rows
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+    body = zlib.compress(raw.tobytes(), 6)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", body) + chunk(b"IEND", b"")
+
+
+def _data_uri(png: bytes) -> str:
+    return "data:image/png;base64," + base64.b64encode(png).decode()
+
+
+def render(rng: "np.random.Generator") -> RenderedChallenge:
+    import numpy as np
+
+    y, x = _grid()
+    fx, fy, fd = rng.uniform(0.03, 0.12, 3)
+    px, py = rng.uniform(0, 2 * np.pi, 2)
+    pattern = np.sin(x * fx + px) * np.cos(y * fy + py) + 0.5 * np.sin((x + y) * fd)
+    pattern += rng.normal(0, 0.15, pattern.shape)
+    board = (np.clip((pattern + 1.5) / 3, 0, 0.999) * LEVELS).astype(np.uint8) * (256 // LEVELS)
+
+    # never at the far left, where the piece starts
+    offset = int(rng.integers(PIECE + MARGIN, WIDTH - PIECE - MARGIN))
+    top = int(rng.integers(MARGIN, HEIGHT - PIECE - MARGIN))
+    notch = (slice(top, top + PIECE), slice(offset, offset + PIECE))
+
+    strip = np.zeros((HEIGHT, PIECE, 2), dtype=np.uint8)
+    strip[top:top + PIECE, :, 0] = board[notch]
+    strip[top:top + PIECE, :, 1] = 255
+    board[notch] //= 3
+    return RenderedChallenge(assets=(_data_uri(_png(board)), _data_uri(_png(strip))), answer=offset)
+
+
+class CaptchaEngine:
+    """Keeps up to `pool_size` rendered challenges ready; each one is served once."""
+
+    def __init__(self, pool_size: int, seed: Optional[int] = None) -> None:
+        self.pool_size = pool_size
+        self.rendered_total = 0  # by the background thread
+        self.inline_total = 0  # rendered on the request because the pool was empty
+        self.seed = seed
+        self._pool: Deque[RenderedChallenge] = deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refill, name="captcha-pool", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _refill(self) -> None:
+        import numpy as np
+
+        rng = np.random.default_rng(self.seed)  # this thread only: Generators are not thread-safe
+        while not self._stop.is_set():
+            self._wake.clear()  # before the fill, so a take() during it is not lost
+            while len(self._pool) < self.pool_size and not self._stop.is_set():
+                self._pool.append(render(rng))
+                self.rendered_total += 1
+            self._wake.wait()
+
+    def take(self) -> RenderedChallenge:
+        try:
+            challenge = self._pool.popleft()  # deque pops are atomic: no lock on the hot path
+        except IndexError:
+            import numpy as np
+
+            challenge = render(np.random.default_rng())
+            self.inline_total += 1
+        self._wake.set()
+        return challenge
+
+    def wait_ready(self, count: int, timeout: float) -> bool:
+        """Block until `count` challenges are pooled (capped at `pool_size`); False on timeout."""
+        deadline = time.monotonic() + timeout
+        while len(self._pool) < min(count, self.pool_size):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "pool_size": self.pool_size,
+            "ready": len(self._pool),
+            "rendered": self.rendered_total,
+            "rendered_inline": self.inline_total,
+        }
+
+
+@lru_cache
+def get_captcha_engine() -> CaptchaEngine:
+    engine = CaptchaEngine(get_settings().captcha_pool_size)
+    engine.start()
+    return engine
@@ -7,7 +7,28 @@ class Settings(BaseSettings):
     app_version: str = "0.1.0"
     bleed_secret: str = Field("dev-ble-secret", alias="BLE_SECRET")
     vault_key: str = Field("change-me", alias="VAULT_KEY")
+    fast_responses: bool = Field(False, alias="FAST_RESPONSES")  # skip response_model re-validation
     risk_model: str = Field("heuristic", alias="RISK_MODEL")
+    risk_cache_bytes: int = Field(16 * 1024 * 1024, alias="RISK_CACHE_BYTES")  # 0 disables the cache
+    risk_cache_ttl: float = Field(3600.0, alias="RISK_CACHE_TTL")
+    risk_stream_chunk_bytes: int = Field(64 * 1024, alias="RISK_STREAM_CHUNK_BYTES")
+    risk_pool_workers: int = Field(0, alias="RISK_POOL_WORKERS")  # 0 = one per core
+    ble_intent_ttl: int = Field(120, alias="BLE_INTENT_TTL")
+    ble_reaper_interval: float = Field(5.0, alias="BLE_REAPER_INTERVAL")
+    captcha_pool_size: int = Field(256, alias="CAPTCHA_POOL_SIZE")  # pre-rendered challenges kept ready
+    captcha_ttl: int = Field(120, alias="CAPTCHA_TTL")
+    captcha_tolerance: int = Field(4, alias="CAPTCHA_TOLERANCE")  # px
+    lazy_imports: bool = Field(True, alias="LAZY_IMPORTS")  # false: import NumPy/risk/captcha at boot
+    warmup: bool = Field(False, alias="WARMUP")  # prime engines and pools before the worker takes traffic
+    web_workers: int = Field(0, alias="WEB_WORKERS")  # python -m app --serve; 0 = one per core
+    metrics_enabled: bool = Field(True, alias="METRICS_ENABLED")
+    rate_limit_enabled: bool = Field(True, alias="RATE_LIMIT_ENABLED")
+    rate_limit_ble_per_minute: int = Field(30, alias="RATE_LIMIT_BLE_PER_MINUTE")
+    rate_limit_captcha_per_minute: int = Field(10, alias="RATE_LIMIT_CAPTCHA_PER_MINUTE")
+    rate_limit_burst: int = Field(5, alias="RATE_LIMIT_BURST")
+    storage_backend: str = Field("memory", alias="STORAGE_BACKEND")
+    sqlite_path: str = Field("authset.db", alias="SQLITE_PATH")
+    sqlite_pool_size: int = Field(4, alias="SQLITE_POOL_SIZE")
 
     class Config:
         env_file = ".env"
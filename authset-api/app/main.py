@@ -1,13 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .captcha import get_captcha_engine
 from .config import get_settings
+from .metrics import MetricsMiddleware
+from .ratelimit import RateLimitMiddleware
+from .repositories import get_repositories
 from .routes import router
+from .services import reap_expired
+
+WARMUP_CAPTCHAS = 32  # enough for a login burst while the background thread fills the rest
+WARMUP_TIMEOUT = 10.0  # s; a slow host starts anyway, serving inline renders until the pool catches up
+
+
+def preload() -> None:
+    """Import what lazy mode defers to first use (NumPy, risk engine, process pool)."""
+    import numpy  # noqa: F401
+
+    from . import risk, risk_cache, risk_pool  # noqa: F401
+
+
+def warmup() -> None:
+    """
+    Pay the first-request costs up front (runs before the worker accepts traffic).
+
+    Imports the lazy modules, builds the risk engine and scores every lexicon
+    phrase once (fills its per-word memo), touches each store so SQLite pages
+    are cached, and waits for a first batch of captchas in the pool.
+    """
+    preload()
+    from .risk import LEXICON, get_risk_engine
+
+    sample = " ".join(phrase.replace("*", "") for clause in LEXICON for phrase in clause.phrases)
+    get_risk_engine().analyze(sample)
+    repositories = get_repositories()
+    repositories.vault.count()
+    repositories.ble_intents.live_count()
+    repositories.ble_trust.count()
+    get_captcha_engine().wait_ready(WARMUP_CAPTCHAS, timeout=WARMUP_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    repositories = get_repositories()
+    if settings.warmup:
+        await asyncio.to_thread(warmup)  # uvicorn only accepts connections once startup completes
+    elif not settings.lazy_imports:
+        get_captcha_engine()  # start filling the pool before the first request
+    reaper = asyncio.create_task(reap_expired(settings.ble_reaper_interval))
+    yield
+    reaper.cancel()
+    with suppress(asyncio.CancelledError):
+        await reaper
+    if get_captcha_engine.cache_info().currsize:
+        get_captcha_engine().stop()
+        get_captcha_engine.cache_clear()
+    repositories.close()
+    get_repositories.cache_clear()
+    from .risk_pool import get_risk_pool
+
+    if get_risk_pool.cache_info().currsize:  # only if a batch ever started it
+        get_risk_pool().shutdown()
+        get_risk_pool.cache_clear()
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.app_name, version=settings.app_version)
+    if not settings.lazy_imports:
+        preload()
+    app = FastAPI(title=settings.app_name, version=settings.app_version, lifespan=lifespan)
+
+    if settings.rate_limit_enabled:
+        app.add_middleware(RateLimitMiddleware)  # added first: CORS wraps it, so 429s carry CORS headers
 
     app.add_middleware(
         CORSMiddleware,
@@ -16,6 +84,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)  # outermost: times everything, 429s included
 
     app.include_router(router)
 
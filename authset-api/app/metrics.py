@@ -0,0 +1,210 @@
+"""Prometheus metrics without the client library.
+
+The middleware records, per method and route template (`/auth/ble/trust/{owner_id}`,
+never the raw path, so cardinality stays bounded), a request counter by status
+and a fixed-bucket latency histogram, plus an in-flight gauge. Store sizes and
+cache/pool state are read by callbacks only when `/metrics` is scraped, so they
+cost nothing per request.
+
+Request metrics are updated from the event loop thread only; `Histogram` still
+takes a lock because the risk engine timings are observed from the threadpool.
+"""
+
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# seconds; the auth routes sit in the low milliseconds, risk analysis in the tens
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+UNMATCHED = "unmatched"  # 404s and anything else the router did not match
+# route template set by middleware that answers before routing (rate-limit 429s)
+ROUTE_PATH = "authset.route_path"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name, self.help = name, help
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name, self.help = name, help
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last), sum]; cumulated only on exposition
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted((labels, list(counts), total[0]) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class Collector:
+    """Values computed at scrape time: `collect()` returns {labels: value}."""
+
+    def __init__(self, name: str, help: str, type: str, collect: Callable[[], Dict[Labels, float]]) -> None:
+        self.name, self.help, self.type = name, help, type
+        self.collect = collect
+
+    def expose(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in sorted(self.collect().items()):
+            yield f"{self.name}{_format_labels(labels)} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            try:
+                lines.extend(metric.expose())
+            except Exception as exc:  # one broken collector must not take the endpoint down
+                lines.append(f"# {metric.name} unavailable: {exc!r}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REQUESTS = REGISTRY.register(Counter("authset_http_requests_total", "HTTP requests by route template and status."))
+REQUEST_SECONDS = REGISTRY.register(
+    Histogram("authset_http_request_duration_seconds", "HTTP request latency by route template.")
+)
+IN_FLIGHT = REGISTRY.register(Gauge("authset_http_requests_in_flight", "HTTP requests being served."))
+RISK_SECONDS = REGISTRY.register(
+    Histogram("authset_risk_analysis_seconds", "Risk engine time per analysis that missed the cache.")
+)
+
+
+# read at scrape time; the risk cache and captcha pool are only reported once
+# something created them, so a scrape never imports NumPy or starts the pool
+
+
+def _store_sizes() -> Dict[Labels, float]:
+    from .repositories import get_repositories
+
+    repositories = get_repositories()
+    return {
+        (("store", "vault"),): repositories.vault.count(),
+        (("store", "ble_intents"),): repositories.ble_intents.live_count(),
+        (("store", "ble_trust"),): repositories.ble_trust.count(),
+        (("store", "captcha_answers"),): repositories.captchas.live_count(),
+        (("store", "rate_limits"),): repositories.rate_limits.live_count(),
+    }
+
+
+def _created(module: str, getter: str):
+    loaded = sys.modules.get(f"{__package__}.{module}")
+    get = getattr(loaded, getter, None)
+    return get() if get is not None and get.cache_info().currsize else None
+
+
+def _risk_cache() -> Dict[Labels, float]:
+    cache = _created("risk_cache", "get_risk_cache")
+    return {(("field", key),): value for key, value in cache.snapshot().items()} if cache else {}
+
+
+def _captcha_pool() -> Dict[Labels, float]:
+    engine = _created("captcha", "get_captcha_engine")
+    return {(("field", key),): value for key, value in engine.snapshot().items()} if engine else {}
+
+
+REGISTRY.register(Collector("authset_store_entries", "Entries per store.", "gauge", _store_sizes))
+REGISTRY.register(Collector("authset_risk_cache", "Risk cache state and counters.", "gauge", _risk_cache))
+REGISTRY.register(Collector("authset_captcha_pool", "Captcha pool state and counters.", "gauge", _captcha_pool))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500  # if the app raises before starting a response
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.dec()
+            route = scope.get("route")  # set by the router on match
+            path = getattr(route, "path", UNMATCHED) if route is not None else scope.get(ROUTE_PATH, UNMATCHED)
+            labels = (("method", scope["method"]), ("route", path))
+            REQUEST_SECONDS.observe(elapsed, labels)
+            REQUESTS.inc(labels + (("status", str(status)),))
+
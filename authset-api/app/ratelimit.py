@@ -0,0 +1,129 @@
+"""Throttling for the auth routes that can be brute-forced.
+
+GCRA (generic cell rate algorithm): each key keeps one timestamp in the
+`rate_limits` repository instead of a log of attempts, so memory does not grow
+with the window. Keys are the client IP and, when the JSON body carries one,
+the `device_id`; both need budget left, so rotating device ids does not get
+around the IP limit, and they are charged together or not at all. Shed
+requests get a 429 with Retry-After before the body reaches FastAPI or the
+services. With `STORAGE_BACKEND=sqlite` the state is shared by every worker on
+the host.
+"""
+
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from anyio import to_thread
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import Settings, get_settings
+from .metrics import ROUTE_PATH
+from .repositories import get_repositories
+
+CAPTCHA_SOLVE_PATH = "/captcha/solve"
+FAILED_SOLVE_COST = 1  # a wrong captcha answer counts as one more attempt
+
+
+@dataclass(frozen=True)
+class Rule:
+    per_minute: int
+    burst: int  # requests allowed back to back before the rate applies
+
+    @property
+    def interval(self) -> float:
+        return 60.0 / self.per_minute
+
+
+def rate_limit_rules(settings: Settings) -> Dict[str, Rule]:
+    ble = Rule(settings.rate_limit_ble_per_minute, settings.rate_limit_burst)
+    return {
+        "/auth/ble/intent": ble,
+        "/auth/ble/confirm": ble,
+        CAPTCHA_SOLVE_PATH: Rule(settings.rate_limit_captcha_per_minute, settings.rate_limit_burst),
+    }
+
+
+def rate_limit_key(path: str, kind: str, value: str) -> str:
+    return f"{path}|{kind}:{value}"
+
+
+def client_ip(scope: Scope) -> str:
+    # behind nginx, run uvicorn with --proxy-headers so this is the real client
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def charge(keys: List[str], rule: Rule, cost: int = 1, force: bool = False) -> Tuple[bool, float]:
+    """Charge every key, or none if any is out of budget. Returns (allowed, retry_after)."""
+    return get_repositories().rate_limits.charge(keys, rule.interval, rule.burst, cost, force)
+
+
+def _device_id(body: bytes) -> Optional[str]:
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return None
+    device_id = payload.get("device_id") if isinstance(payload, dict) else None
+    return device_id if isinstance(device_id, str) and device_id else None
+
+
+async def _read_body(receive: Receive) -> Tuple[bytes, Receive]:
+    """Read the whole request body and return it with a `receive` that replays it."""
+    chunks, pending = [], None
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            pending = message  # client disconnected mid-body
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay() -> Message:
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return pending if pending is not None else await receive()
+
+    return body, replay
+
+
+def _shed_content(path: str, retry_after: int) -> Dict:
+    if path == CAPTCHA_SOLVE_PATH:  # same shape as CaptchaSolveResponse
+        return {"success": False, "next_challenge_in": retry_after}
+    return {"detail": "too many requests", "retry_after": retry_after}
+
+
+class RateLimitMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.rules = rate_limit_rules(get_settings())
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = self.rules.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        body, receive = await _read_body(receive)
+        keys = [rate_limit_key(path, "ip", client_ip(scope))]
+        device_id = _device_id(body)
+        if device_id:
+            keys.append(rate_limit_key(path, "device", device_id))
+        if get_repositories().pool is None:
+            allowed, retry_after = charge(keys, rule)
+        else:  # SQLite: don't block the event loop
+            allowed, retry_after = await to_thread.run_sync(charge, keys, rule)
+        if not allowed:
+            scope[ROUTE_PATH] = path  # rule paths are route templates: the 429 is labelled like a routed request
+            seconds = math.ceil(retry_after)
+            response = JSONResponse(_shed_content(path, seconds), status_code=429, headers={"Retry-After": str(seconds)})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
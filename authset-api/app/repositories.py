@@ -0,0 +1,732 @@
+"""Storage backends for vault entries, BLE intents, BLE trust circles, captcha answers and rate limits.
+
+`memory` keeps everything in process (single worker, tests). `sqlite` keeps it
+in a WAL-mode database file that every uvicorn worker on the host can open, so
+requests can land on any worker without sticky sessions.
+"""
+
+import bisect
+import heapq
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from queue import Empty, LifoQueue
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .config import Settings, get_settings
+from .schemas import BLEIntent, BLETrustEntry, VaultEntry, VaultType
+
+# (updated_at, id): the vault listing order (newest first) and the pagination cursor
+VaultKey = Tuple[datetime, str]
+
+
+class DuplicateKeyError(Exception):
+    pass
+
+
+class CaptchaAnswer(NamedTuple):
+    answer: int  # slider offset, px
+    expires_at: datetime
+
+
+class VaultRepository(ABC):
+    @abstractmethod
+    def add(self, entry: VaultEntry) -> VaultEntry:
+        """Insert a new entry; raises DuplicateKeyError if the id is taken."""
+
+    @abstractmethod
+    def get(self, entry_id: str) -> Optional[VaultEntry]: ...
+
+    @abstractmethod
+    def query(
+        self,
+        limit: int,
+        type: Optional[VaultType] = None,
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        after: Optional[VaultKey] = None,
+    ) -> List[VaultEntry]:
+        """Newest first; `updated_since` is inclusive, `updated_before` and `after` exclusive."""
+
+    @abstractmethod
+    def count(self) -> int: ...
+
+
+class BLEIntentRepository(ABC):
+    """Intents live until consumed by a confirm or reaped after `expires_at`."""
+
+    def __init__(self) -> None:
+        self.consumed_total = 0
+        self.expired_total = 0
+
+    @abstractmethod
+    def add(self, intent: BLEIntent, device_id: str, action: str) -> BLEIntent: ...
+
+    @abstractmethod
+    def get(self, intent_id: str) -> Optional[BLEIntent]: ...
+
+    @abstractmethod
+    def consume(self, intent_id: str) -> Optional[BLEIntent]:
+        """Remove and return the intent atomically, so it can be confirmed once."""
+
+    @abstractmethod
+    def purge_expired(self, now: datetime) -> int:
+        """Drop every intent that expired before `now`; returns how many."""
+
+    @abstractmethod
+    def live_count(self) -> int: ...
+
+    def stats(self) -> Dict[str, int]:
+        return {"live": self.live_count(), "consumed": self.consumed_total, "expired": self.expired_total}
+
+
+class BLETrustRepository(ABC):
+    """Trust circles keyed by owner, then device; listing follows last-upsert order."""
+
+    @abstractmethod
+    def upsert(self, entry: BLETrustEntry) -> List[BLETrustEntry]:
+        """Insert or replace the device and return the owner's circle."""
+
+    @abstractmethod
+    def upsert_many(self, entries: List[BLETrustEntry]) -> int: ...
+
+    @abstractmethod
+    def remove(self, owner_id: str, device_id: str) -> bool: ...
+
+    @abstractmethod
+    def list(self, owner_id: str) -> List[BLETrustEntry]: ...
+
+    @abstractmethod
+    def count(self) -> int:
+        """Trusted devices across every owner."""
+
+
+class CaptchaAnswerRepository(ABC):
+    """Expected answer per captcha id; single use, like BLE intents."""
+
+    def __init__(self) -> None:
+        self.consumed_total = 0
+        self.expired_total = 0
+
+    @abstractmethod
+    def add(self, captcha_id: str, answer: CaptchaAnswer) -> None: ...
+
+    @abstractmethod
+    def consume(self, captcha_id: str) -> Optional[CaptchaAnswer]:
+        """Remove and return the answer atomically, so each captcha gets one attempt."""
+
+    @abstractmethod
+    def purge_expired(self, now: datetime) -> int: ...
+
+    @abstractmethod
+    def live_count(self) -> int: ...
+
+    def stats(self) -> Dict[str, int]:
+        return {"live": self.live_count(), "consumed": self.consumed_total, "expired": self.expired_total}
+
+
+class RateLimitRepository(ABC):
+    """GCRA state: one theoretical arrival time (epoch seconds) per key.
+
+    A key with `tat <= now` is the same as an unseen key, so the reaper can
+    drop it; memory only holds keys that are currently throttled or bursting.
+    Wall-clock time, not monotonic, so SQLite state is comparable across workers.
+    """
+
+    @abstractmethod
+    def charge(
+        self, keys: Sequence[str], interval: float, burst: int, cost: int = 1, force: bool = False
+    ) -> Tuple[bool, float]:
+        """Spend `cost` requests on every key; returns (allowed, seconds until the next request is allowed).
+
+        All or nothing: if any key is out of budget, no key is charged, so a
+        request denied on its device id doesn't use up its IP's quota.
+        `force` always charges (used for penalties on failed attempts).
+        """
+
+    @abstractmethod
+    def purge_expired(self, now: datetime) -> int: ...
+
+    @abstractmethod
+    def live_count(self) -> int: ...
+
+
+def _gcra(
+    tat: Optional[float], now: float, interval: float, burst: int, cost: int, force: bool
+) -> Tuple[float, bool, float]:
+    """Returns (new tat, allowed, retry_after) for one charge."""
+    tolerance = burst * interval  # `burst` requests may arrive back to back
+    new_tat = max(tat or now, now) + cost * interval
+    allowed = force or new_tat - tolerance <= now
+    if not allowed:
+        new_tat = max(tat or now, now)
+    return new_tat, allowed, max(0.0, new_tat + interval - tolerance - now)
+
+
+def _gcra_all(
+    tats: Sequence[Optional[float]], now: float, interval: float, burst: int, cost: int, force: bool
+) -> Tuple[Optional[List[float]], bool, float]:
+    """Returns (new tats, or None if any key denies, allowed, retry_after) for an all-or-nothing charge."""
+    charges = [_gcra(tat, now, interval, burst, cost, force) for tat in tats]
+    denied = [retry_after for _, allowed, retry_after in charges if not allowed]
+    if denied:
+        return None, False, max(denied)
+    return [tat for tat, _, _ in charges], True, max((retry_after for _, _, retry_after in charges), default=0.0)
+
+
+def _epoch(moment: datetime) -> float:
+    # naive datetimes in this module are UTC
+    return moment.replace(tzinfo=timezone.utc).timestamp()
+
+
+# -- in-memory ---------------------------------------------------------------
+
+
+class InMemoryVaultRepository(VaultRepository):
+    """Entries by id plus sorted (updated_at, id) indexes: one global, one per VaultType."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, VaultEntry] = {}
+        self._by_time: List[VaultKey] = []
+        self._by_type: Dict[VaultType, List[VaultKey]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, entry: VaultEntry) -> VaultEntry:
+        key = (entry.updated_at, entry.id)
+        with self._lock:
+            if entry.id in self._entries:
+                raise DuplicateKeyError(entry.id)
+            self._entries[entry.id] = entry
+            bisect.insort(self._by_time, key)
+            bisect.insort(self._by_type.setdefault(entry.type, []), key)
+        return entry
+
+    def get(self, entry_id: str) -> Optional[VaultEntry]:
+        return self._entries.get(entry_id)
+
+    def query(
+        self,
+        limit: int,
+        type: Optional[VaultType] = None,
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        after: Optional[VaultKey] = None,
+    ) -> List[VaultEntry]:
+        with self._lock:
+            index = self._by_time if type is None else self._by_type.get(type, [])
+            hi = len(index)
+            if updated_before is not None:
+                hi = bisect.bisect_left(index, (updated_before, ""))
+            if after is not None:
+                hi = min(hi, bisect.bisect_left(index, after))
+            lo = bisect.bisect_left(index, (updated_since, "")) if updated_since is not None else 0
+            keys = index[max(lo, hi - limit):hi]
+            return [self._entries[entry_id] for _, entry_id in reversed(keys)]
+
+    def count(self) -> int:
+        return len(self._entries)
+
+
+class InMemoryBLEIntentRepository(BLEIntentRepository):
+    """Dict for lookups plus a min-heap on expiry, so reaping only touches expired intents."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._intents: Dict[str, BLEIntent] = {}
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, intent: BLEIntent, device_id: str, action: str) -> BLEIntent:
+        with self._lock:
+            self._intents[intent.intent_id] = intent
+            heapq.heappush(self._expiry, (intent.expires_at, intent.intent_id))
+        return intent
+
+    def get(self, intent_id: str) -> Optional[BLEIntent]:
+        return self._intents.get(intent_id)
+
+    def consume(self, intent_id: str) -> Optional[BLEIntent]:
+        with self._lock:
+            intent = self._intents.pop(intent_id, None)
+            if intent is not None:
+                self.consumed_total += 1
+                # consumed intents leave stale heap entries; rebuild once they dominate
+                if len(self._expiry) > 2 * len(self._intents) + 64:
+                    self._expiry = [(i.expires_at, i.intent_id) for i in self._intents.values()]
+                    heapq.heapify(self._expiry)
+        return intent
+
+    def purge_expired(self, now: datetime) -> int:
+        purged = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                _, intent_id = heapq.heappop(self._expiry)
+                if self._intents.pop(intent_id, None) is not None:
+                    purged += 1
+            self.expired_total += purged
+        return purged
+
+    def live_count(self) -> int:
+        return len(self._intents)
+
+
+class InMemoryBLETrustRepository(BLETrustRepository):
+    """owner_id -> device_id -> entry; dict insertion order gives the listing order."""
+
+    def __init__(self) -> None:
+        self._circles: Dict[str, Dict[str, BLETrustEntry]] = {}
+        self._lock = threading.Lock()
+
+    def _put(self, entry: BLETrustEntry) -> Dict[str, BLETrustEntry]:
+        circle = self._circles.setdefault(entry.owner_id, {})
+        circle.pop(entry.device_id, None)  # re-insert so the device moves to the end
+        circle[entry.device_id] = entry
+        return circle
+
+    def upsert(self, entry: BLETrustEntry) -> List[BLETrustEntry]:
+        with self._lock:
+            return list(self._put(entry).values())
+
+    def upsert_many(self, entries: List[BLETrustEntry]) -> int:
+        with self._lock:
+            for entry in entries:
+                self._put(entry)
+        return len(entries)
+
+    def remove(self, owner_id: str, device_id: str) -> bool:
+        with self._lock:
+            circle = self._circles.get(owner_id)
+            if circle is None or circle.pop(device_id, None) is None:
+                return False
+            if not circle:
+                del self._circles[owner_id]
+        return True
+
+    def list(self, owner_id: str) -> List[BLETrustEntry]:
+        with self._lock:
+            return list(self._circles.get(owner_id, {}).values())
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(len(circle) for circle in self._circles.values())
+
+
+class InMemoryCaptchaAnswerRepository(CaptchaAnswerRepository):
+    """Same layout as the intents: dict by id plus an expiry heap for the reaper."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._answers: Dict[str, CaptchaAnswer] = {}
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, captcha_id: str, answer: CaptchaAnswer) -> None:
+        with self._lock:
+            self._answers[captcha_id] = answer
+            heapq.heappush(self._expiry, (answer.expires_at, captcha_id))
+
+    def consume(self, captcha_id: str) -> Optional[CaptchaAnswer]:
+        with self._lock:
+            answer = self._answers.pop(captcha_id, None)
+            if answer is not None:
+                self.consumed_total += 1
+                if len(self._expiry) > 2 * len(self._answers) + 64:
+                    self._expiry = [(a.expires_at, i) for i, a in self._answers.items()]
+                    heapq.heapify(self._expiry)
+        return answer
+
+    def purge_expired(self, now: datetime) -> int:
+        purged = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                _, captcha_id = heapq.heappop(self._expiry)
+                if self._answers.pop(captcha_id, None) is not None:
+                    purged += 1
+            self.expired_total += purged
+        return purged
+
+    def live_count(self) -> int:
+        return len(self._answers)
+
+
+class InMemoryRateLimitRepository(RateLimitRepository):
+    def __init__(self) -> None:
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def charge(
+        self, keys: Sequence[str], interval: float, burst: int, cost: int = 1, force: bool = False
+    ) -> Tuple[bool, float]:
+        with self._lock:
+            tats, allowed, retry_after = _gcra_all(
+                [self._tats.get(key) for key in keys], time.time(), interval, burst, cost, force
+            )
+            if tats is not None:
+                self._tats.update(zip(keys, tats))
+        return allowed, retry_after
+
+    def purge_expired(self, now: datetime) -> int:
+        cutoff = _epoch(now)
+        with self._lock:
+            expired = [key for key, tat in self._tats.items() if tat <= cutoff]
+            for key in expired:
+                del self._tats[key]
+        return len(expired)
+
+    def live_count(self) -> int:
+        return len(self._tats)
+
+
+# -- sqlite ------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vault_entries (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS vault_entries_updated_at ON vault_entries (updated_at, id);
+CREATE INDEX IF NOT EXISTS vault_entries_type_updated_at ON vault_entries (type, updated_at, id);
+CREATE TABLE IF NOT EXISTS ble_intents (
+    intent_id TEXT PRIMARY KEY,
+    device_id TEXT NOT NULL,
+    action TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ble_intents_device_id ON ble_intents (device_id);
+CREATE INDEX IF NOT EXISTS ble_intents_expires_at ON ble_intents (expires_at);
+CREATE TABLE IF NOT EXISTS ble_trust (
+    owner_id TEXT NOT NULL,
+    device_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (owner_id, device_id)
+);
+CREATE INDEX IF NOT EXISTS ble_trust_owner_id ON ble_trust (owner_id);
+CREATE INDEX IF NOT EXISTS ble_trust_device_id ON ble_trust (device_id);
+CREATE TABLE IF NOT EXISTS captcha_answers (
+    captcha_id TEXT PRIMARY KEY,
+    answer INTEGER NOT NULL,
+    expires_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS captcha_answers_expires_at ON captcha_answers (expires_at);
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tat REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rate_limits_tat ON rate_limits (tat);
+"""
+
+
+class SQLitePool:
+    """Fixed-size pool of WAL-mode connections shared by the request threads."""
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._idle: "LifoQueue[sqlite3.Connection]" = LifoQueue(maxsize=size)
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._idle.put(self._connect())
+        with self.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except Empty:
+            raise RuntimeError(f"no idle SQLite connection after {self.timeout}s") from None
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
+
+
+def _sortable(moment: datetime) -> str:
+    # fixed width so timestamps compare correctly as TEXT
+    return moment.isoformat(timespec="microseconds")
+
+
+class SQLiteVaultRepository(VaultRepository):
+    def __init__(self, pool: SQLitePool) -> None:
+        self._pool = pool
+
+    def add(self, entry: VaultEntry) -> VaultEntry:
+        try:
+            with self._pool.connection() as conn:
+                conn.execute(
+                    "INSERT INTO vault_entries (id, type, updated_at, data) VALUES (?, ?, ?, ?)",
+                    (entry.id, entry.type.value, _sortable(entry.updated_at), entry.model_dump_json()),
+                )
+        except sqlite3.IntegrityError:
+            raise DuplicateKeyError(entry.id) from None
+        return entry
+
+    def get(self, entry_id: str) -> Optional[VaultEntry]:
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT data FROM vault_entries WHERE id = ?", (entry_id,)).fetchone()
+        return VaultEntry.model_validate_json(row[0]) if row else None
+
+    def query(
+        self,
+        limit: int,
+        type: Optional[VaultType] = None,
+        updated_since: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        after: Optional[VaultKey] = None,
+    ) -> List[VaultEntry]:
+        clauses, params = [], []
+        if type is not None:
+            clauses.append("type = ?")
+            params.append(type.value)
+        if updated_since is not None:
+            clauses.append("updated_at >= ?")
+            params.append(_sortable(updated_since))
+        if updated_before is not None:
+            clauses.append("updated_at < ?")
+            params.append(_sortable(updated_before))
+        if after is not None:
+            clauses.append("(updated_at, id) < (?, ?)")
+            params.extend((_sortable(after[0]), after[1]))
+        where = f"WHERE {' AND '.join(clauses)} " if clauses else ""
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT data FROM vault_entries {where}ORDER BY updated_at DESC, id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return [VaultEntry.model_validate_json(data) for (data,) in rows]
+
+    def count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM vault_entries").fetchone()[0]
+
+
+class SQLiteBLEIntentRepository(BLEIntentRepository):
+    """Counters are per worker; `live` is read from the shared table."""
+
+    def __init__(self, pool: SQLitePool) -> None:
+        super().__init__()
+        self._pool = pool
+
+    def add(self, intent: BLEIntent, device_id: str, action: str) -> BLEIntent:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO ble_intents (intent_id, device_id, action, expires_at, data) VALUES (?, ?, ?, ?, ?)",
+                (intent.intent_id, device_id, action, _sortable(intent.expires_at), intent.model_dump_json()),
+            )
+        return intent
+
+    def get(self, intent_id: str) -> Optional[BLEIntent]:
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT data FROM ble_intents WHERE intent_id = ?", (intent_id,)).fetchone()
+        return BLEIntent.model_validate_json(row[0]) if row else None
+
+    def consume(self, intent_id: str) -> Optional[BLEIntent]:
+        with self._pool.transaction() as conn:
+            row = conn.execute("SELECT data FROM ble_intents WHERE intent_id = ?", (intent_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM ble_intents WHERE intent_id = ?", (intent_id,))
+        if not row:
+            return None
+        self.consumed_total += 1
+        return BLEIntent.model_validate_json(row[0])
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._pool.connection() as conn:
+            purged = conn.execute("DELETE FROM ble_intents WHERE expires_at < ?", (_sortable(now),)).rowcount
+        self.expired_total += purged
+        return purged
+
+    def live_count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM ble_intents").fetchone()[0]
+
+
+class SQLiteBLETrustRepository(BLETrustRepository):
+    def __init__(self, pool: SQLitePool) -> None:
+        self._pool = pool
+
+    @staticmethod
+    def _put(conn: sqlite3.Connection, entry: BLETrustEntry) -> None:
+        # delete + insert moves the device to the end of the circle (new rowid),
+        # matching the in-memory ordering
+        conn.execute("DELETE FROM ble_trust WHERE owner_id = ? AND device_id = ?", (entry.owner_id, entry.device_id))
+        conn.execute(
+            "INSERT INTO ble_trust (owner_id, device_id, data) VALUES (?, ?, ?)",
+            (entry.owner_id, entry.device_id, entry.model_dump_json()),
+        )
+
+    def upsert(self, entry: BLETrustEntry) -> List[BLETrustEntry]:
+        with self._pool.transaction() as conn:
+            self._put(conn, entry)
+            rows = conn.execute(
+                "SELECT data FROM ble_trust WHERE owner_id = ? ORDER BY rowid", (entry.owner_id,)
+            ).fetchall()
+        return [BLETrustEntry.model_validate_json(data) for (data,) in rows]
+
+    def upsert_many(self, entries: List[BLETrustEntry]) -> int:
+        with self._pool.transaction() as conn:
+            for entry in entries:
+                self._put(conn, entry)
+        return len(entries)
+
+    def remove(self, owner_id: str, device_id: str) -> bool:
+        with self._pool.connection() as conn:
+            cursor = conn.execute("DELETE FROM ble_trust WHERE owner_id = ? AND device_id = ?", (owner_id, device_id))
+        return cursor.rowcount == 1
+
+    def list(self, owner_id: str) -> List[BLETrustEntry]:
+        with self._pool.connection() as conn:
+            rows = conn.execute("SELECT data FROM ble_trust WHERE owner_id = ? ORDER BY rowid", (owner_id,)).fetchall()
+        return [BLETrustEntry.model_validate_json(data) for (data,) in rows]
+
+    def count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM ble_trust").fetchone()[0]
+
+
+class SQLiteCaptchaAnswerRepository(CaptchaAnswerRepository):
+    """Counters are per worker; `live` is read from the shared table."""
+
+    def __init__(self, pool: SQLitePool) -> None:
+        super().__init__()
+        self._pool = pool
+
+    def add(self, captcha_id: str, answer: CaptchaAnswer) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO captcha_answers (captcha_id, answer, expires_at) VALUES (?, ?, ?)",
+                (captcha_id, answer.answer, _sortable(answer.expires_at)),
+            )
+
+    def consume(self, captcha_id: str) -> Optional[CaptchaAnswer]:
+        with self._pool.transaction() as conn:
+            row = conn.execute(
+                "SELECT answer, expires_at FROM captcha_answers WHERE captcha_id = ?", (captcha_id,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM captcha_answers WHERE captcha_id = ?", (captcha_id,))
+        if not row:
+            return None
+        self.consumed_total += 1
+        return CaptchaAnswer(row[0], datetime.fromisoformat(row[1]))
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._pool.connection() as conn:
+            purged = conn.execute("DELETE FROM captcha_answers WHERE expires_at < ?", (_sortable(now),)).rowcount
+        self.expired_total += purged
+        return purged
+
+    def live_count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM captcha_answers").fetchone()[0]
+
+
+class SQLiteRateLimitRepository(RateLimitRepository):
+    """Shared by every worker on the host, so a burst can't be spread across processes."""
+
+    def __init__(self, pool: SQLitePool) -> None:
+        self._pool = pool
+
+    def charge(
+        self, keys: Sequence[str], interval: float, burst: int, cost: int = 1, force: bool = False
+    ) -> Tuple[bool, float]:
+        with self._pool.transaction() as conn:
+            placeholders = ",".join("?" * len(keys))
+            current = dict(conn.execute(f"SELECT key, tat FROM rate_limits WHERE key IN ({placeholders})", keys))
+            tats, allowed, retry_after = _gcra_all(
+                [current.get(key) for key in keys], time.time(), interval, burst, cost, force
+            )
+            if tats is not None:
+                conn.executemany(
+                    "INSERT INTO rate_limits (key, tat) VALUES (?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tat = excluded.tat",
+                    zip(keys, tats),
+                )
+        return allowed, retry_after
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (_epoch(now),)).rowcount
+
+    def live_count(self) -> int:
+        with self._pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+
+
+# -- wiring ------------------------------------------------------------------
+
+
+@dataclass
+class Repositories:
+    vault: VaultRepository
+    ble_intents: BLEIntentRepository
+    ble_trust: BLETrustRepository
+    captchas: CaptchaAnswerRepository
+    rate_limits: RateLimitRepository
+    pool: Optional[SQLitePool] = None
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+
+
+def build_repositories(settings: Settings) -> Repositories:
+    backend = settings.storage_backend.lower()
+    if backend == "memory":
+        return Repositories(
+            vault=InMemoryVaultRepository(),
+            ble_intents=InMemoryBLEIntentRepository(),
+            ble_trust=InMemoryBLETrustRepository(),
+            captchas=InMemoryCaptchaAnswerRepository(),
+            rate_limits=InMemoryRateLimitRepository(),
+        )
+    if backend == "sqlite":
+        pool = SQLitePool(settings.sqlite_path, size=settings.sqlite_pool_size)
+        return Repositories(
+            vault=SQLiteVaultRepository(pool),
+            ble_intents=SQLiteBLEIntentRepository(pool),
+            ble_trust=SQLiteBLETrustRepository(pool),
+            captchas=SQLiteCaptchaAnswerRepository(pool),
+            rate_limits=SQLiteRateLimitRepository(pool),
+            pool=pool,
+        )
+    raise ValueError(f"unknown STORAGE_BACKEND: {settings.storage_backend!r}")
+
+
+@lru_cache
+def get_repositories() -> Repositories:
+    return build_repositories(get_settings())
@@ -0,0 +1,49 @@
+"""Response classes shared by the routes."""
+
+import json
+from typing import Any
+
+import anyio
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive
+
+from .config import get_settings
+
+try:
+    import orjson
+except ImportError:  # optional extra: pip install -e .[fast]
+    orjson = None
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """StreamingResponse for generators that are still reading the request body.
+
+    Stock StreamingResponse listens for `http.disconnect` on `receive()` while
+    streaming, which would steal the body chunks from `request.stream()`. Here
+    the body iterator owns `receive()` and sees the disconnect itself.
+    """
+
+    async def listen_for_disconnect(self, receive: Receive) -> None:
+        await anyio.sleep_forever()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for trusted objects the services built themselves.
+
+    Returning a Response makes FastAPI skip `response_model` validation and
+    `jsonable_encoder`. Models are dumped by their compiled pydantic
+    serializer; plain dicts by orjson, or compact stdlib json without it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def fast(content: Any) -> Any:
+    """Wrap `content` in a FastJSONResponse when FAST_RESPONSES is on; otherwise leave it to FastAPI."""
+    return FastJSONResponse(content) if get_settings().fast_responses else content
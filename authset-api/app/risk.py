@@ -0,0 +1,336 @@
+"""Contract risk scoring engines, selected by the RISK_MODEL setting.
+
+`heuristic` matches a clause lexicon against the tokenised contract. Each
+distinct word is classified once and then memoised, so the per-token cost is
+one dict lookup. Full phrases are checked only at positions where a lexicon
+phrase can start. The match counts per term (`np.bincount`) are projected
+onto the risk factors through a (factors x terms) weight matrix, and each
+factor is squashed to [0, 1] with a logistic function. Positive weights are
+risk signals and negative weights are mitigating clauses.
+
+`static` returns the fixed demo response the API shipped with.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .config import get_settings
+from .schemas import RiskAnalysisResponse, RiskFactor
+
+DOMESTIC_JURISDICTION = "BR"
+FOREIGN_FORUM_PENALTY = 0.8
+TOP_TERMS_IN_NOTES = 3
+WORD_CACHE_SIZE = 65536
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+TRAILING_WORD_RE = re.compile(r"\S*\Z")
+MAX_CARRY_CHARS = 4096  # longest run without whitespace held back between stream pieces
+
+
+@dataclass(frozen=True)
+class Factor:
+    label: str
+    bias: float  # logit with no matching clause
+    importance: float  # weight in the overall score
+    recommendation: str
+
+
+@dataclass(frozen=True)
+class Clause:
+    factor: str
+    phrases: Tuple[str, ...]  # normalised words; a trailing "*" matches any suffix
+    weight: float
+    term: str  # shown in the factor notes
+
+
+FACTORS: Tuple[Factor, ...] = (
+    Factor("LGPD", -0.4, 1.2, "Detalhar política de dados pessoais (base legal, finalidade e encarregado)."),
+    Factor("Trabalhista", -0.6, 1.0, "Revisar regime PJ x CLT: remover subordinação, jornada e exclusividade."),
+    Factor("Inadimplência", -0.3, 1.0, "Exigir garantia (fiança, caução ou seguro) para as obrigações de pagamento."),
+    Factor("Multa", -0.5, 0.8, "Limitar a cláusula penal a um teto proporcional ao valor do contrato."),
+    Factor("Foro", -0.8, 0.6, "Eleger foro em comarca brasileira ou prever mediação antes da arbitragem."),
+)
+
+LEXICON: Tuple[Clause, ...] = (
+    # LGPD
+    Clause("LGPD", ("dados pessoais sensiveis", "dados sensiveis"), 1.4, "dados sensíveis"),
+    Clause("LGPD", ("dados pessoais",), 0.9, "dados pessoais"),
+    Clause("LGPD", ("compartilha* dados", "compartilha* de dados", "compartilha* os dados"), 1.0,
+           "compartilhamento de dados"),
+    Clause("LGPD", ("transferencia internacional",), 1.2, "transferência internacional"),
+    Clause("LGPD", ("lgpd", "13 709", "13709"), -0.7, "LGPD citada"),
+    Clause("LGPD", ("consentimento",), -0.5, "consentimento"),
+    Clause("LGPD", ("encarregado", "dpo"), -0.5, "encarregado/DPO"),
+    Clause("LGPD", ("anonimiza*", "pseudonimiza*"), -0.5, "anonimização"),
+    # Trabalhista
+    Clause("Trabalhista", ("subordinac*",), 1.2, "subordinação"),
+    Clause("Trabalhista", ("exclusividade",), 0.8, "exclusividade"),
+    Clause("Trabalhista", ("jornada", "horario fixo", "controle de ponto"), 1.0, "jornada/horário"),
+    Clause("Trabalhista", ("habitualidade", "pessoalidade"), 1.0, "habitualidade/pessoalidade"),
+    Clause("Trabalhista", ("pessoa juridica", "pj"), 0.5, "contratação PJ"),
+    Clause("Trabalhista", ("sem vinculo empregaticio", "inexistencia de vinculo"), -0.8, "ausência de vínculo"),
+    Clause("Trabalhista", ("vinculo empregaticio",), 0.8, "vínculo empregatício"),
+    Clause("Trabalhista", ("autonom*",), -0.6, "autonomia"),
+    # Inadimplência
+    Clause("Inadimplência", ("inadimpl*",), 0.8, "inadimplemento"),
+    Clause("Inadimplência", ("atraso*",), 0.6, "atraso"),
+    Clause("Inadimplência", ("mora",), 0.5, "mora"),
+    Clause("Inadimplência", ("protesto*", "negativac*"), 0.8, "protesto/negativação"),
+    Clause("Inadimplência", ("garantia*", "fianca", "fiador", "caucao"), -0.7, "garantia"),
+    Clause("Inadimplência", ("seguro",), -0.4, "seguro"),
+    # Multa
+    Clause("Multa", ("clausula penal",), 0.8, "cláusula penal"),
+    Clause("Multa", ("multa", "multas"), 0.6, "multa"),
+    Clause("Multa", ("perdas e danos", "indenizac*"), 0.6, "perdas e danos"),
+    Clause("Multa", ("rescis*",), 0.3, "rescisão"),
+    Clause("Multa", ("limitad* a", "teto", "nao podera exceder"), -0.7, "teto"),
+    Clause("Multa", ("proporciona*",), -0.5, "proporcionalidade"),
+    # Foro
+    Clause("Foro", ("foro",), 0.3, "foro"),
+    Clause("Foro", ("arbitragem", "arbitral"), 0.6, "arbitragem"),
+    Clause("Foro", ("jurisdicao estrangeira", "lei estrangeira", "tribuna* do exterior", "tribuna* de exterior"), 1.4,
+           "jurisdição estrangeira"),
+    Clause("Foro", ("renuncia*",), 0.4, "renúncia"),
+    Clause("Foro", ("comarca",), -0.5, "comarca"),
+    Clause("Foro", ("mediacao",), -0.4, "mediação"),
+)
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so the lexicon can be plain ASCII."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return decomposed.encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def _word_matches(word: str, pattern: str) -> bool:
+    return word.startswith(pattern[:-1]) if pattern.endswith("*") else word == pattern
+
+
+class LexiconRiskEngine:
+    def __init__(self, factors: Sequence[Factor] = FACTORS, lexicon: Sequence[Clause] = LEXICON) -> None:
+        self.factors = tuple(factors)
+        self.lexicon = tuple(lexicon)
+        index = {f.label: i for i, f in enumerate(self.factors)}
+
+        # phrases grouped by their first word (exact words and "stem*" prefixes);
+        # longest phrases first so "sem vinculo empregaticio" wins over "vinculo empregaticio"
+        self._heads: List[List[Tuple[Tuple[str, ...], int]]] = []
+        self._exact: Dict[str, int] = {}
+        self._stems: Dict[str, int] = {}
+        for term, clause in enumerate(self.lexicon):
+            for phrase in clause.phrases:
+                first, *rest = phrase.split()
+                table = self._stems if first.endswith("*") else self._exact
+                key = first.rstrip("*")
+                if key not in table:
+                    table[key] = len(self._heads)
+                    self._heads.append([])
+                self._heads[table[key]].append((tuple(rest), term))
+        for candidates in self._heads:
+            candidates.sort(key=lambda c: -len(c[0]))
+        # heads whose phrases are all single words resolve without looking ahead
+        self._single = [c[0][1] if not c[0][0] else None for c in self._heads]
+        self.max_phrase_words = 1 + max(len(c[0][0]) for c in self._heads)
+        self._stem_lengths = sorted({len(stem) for stem in self._stems}, reverse=True)
+        self._word_heads: Dict[str, Tuple[int, ...]] = {}
+
+        self._weights = np.zeros((len(self.factors), len(self.lexicon)))
+        for i, clause in enumerate(self.lexicon):
+            self._weights[index[clause.factor], i] = clause.weight
+        self._bias = np.array([f.bias for f in self.factors])
+        self._importance = np.array([f.importance for f in self.factors])
+        self._importance /= self._importance.sum()
+        self._term_factor = [index[c.factor] for c in self.lexicon]
+        self._foro = index.get("Foro")
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.lexicon)
+
+    def _classify(self, word: str) -> Tuple[int, ...]:
+        """Phrase groups that can start at `word` (memoised per distinct word)."""
+        heads = []
+        if word in self._exact:
+            heads.append(self._exact[word])
+        for length in self._stem_lengths:
+            head = self._stems.get(word[:length]) if len(word) >= length else None
+            if head is not None:
+                heads.append(head)
+        if len(self._word_heads) >= WORD_CACHE_SIZE:
+            self._word_heads.clear()
+        self._word_heads[word] = result = tuple(heads)
+        return result
+
+    def count_tokens(self, tokens: Sequence[str]) -> np.ndarray:
+        """Matches per lexicon term in a token sequence (non-overlapping, left to right)."""
+        hits: List[int] = []
+        self.scan(tokens, len(tokens), 0, hits)
+        return self.bincount(hits)
+
+    def bincount(self, hits: List[int]) -> np.ndarray:
+        return np.bincount(np.asarray(hits, dtype=np.intp), minlength=self.n_terms)
+
+    def scan(self, tokens: Sequence[str], stop: int, next_free: int, hits: List[int]) -> int:
+        """
+        Append the terms of matches starting before `stop` to `hits`.
+
+        Phrases may read past `stop` into the rest of `tokens`. Returns the
+        first position not covered by a match, so a caller scanning a stream
+        window by window can resume without double counting.
+        """
+        lookup = self._word_heads.get
+        candidates: Dict[str, Tuple[int, ...]] = {}
+        for word in set(tokens[:stop]):
+            heads = lookup(word)
+            if heads is None:
+                heads = self._classify(word)
+            if heads:
+                candidates[word] = heads
+
+        for pos in [i for i, word in enumerate(tokens[:stop]) if word in candidates]:
+            if pos < next_free:
+                continue
+            for head in candidates[tokens[pos]]:
+                single = self._single[head]
+                match = (single, 1) if single is not None else self._match_at(tokens, pos, head)
+                if match is not None:
+                    term, length = match
+                    hits.append(term)
+                    next_free = pos + length
+                    break
+        return next_free
+
+    def _match_at(self, tokens: Sequence[str], pos: int, head: int):
+        for rest, term in self._heads[head]:
+            if not rest:
+                return term, 1
+            end = pos + 1 + len(rest)
+            if end <= len(tokens) and all(_word_matches(w, p) for w, p in zip(tokens[pos + 1:end], rest)):
+                return term, 1 + len(rest)
+        return None
+
+    def count(self, text: str) -> np.ndarray:
+        """Matches per lexicon term in `text`."""
+        return self.count_tokens(tokenize(text))
+
+    def stream_counter(self) -> "StreamingCounter":
+        return StreamingCounter(self)
+
+    def factor_scores(self, counts: np.ndarray, jurisdiction: str = DOMESTIC_JURISDICTION) -> np.ndarray:
+        logits = self._bias + self._weights @ np.log1p(counts)
+        if self._foro is not None and jurisdiction.upper() != DOMESTIC_JURISDICTION:
+            logits[self._foro] += FOREIGN_FORUM_PENALTY
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score(self, counts: np.ndarray, jurisdiction: str = DOMESTIC_JURISDICTION) -> RiskAnalysisResponse:
+        scores = self.factor_scores(counts, jurisdiction)
+        notes = self._notes(counts)
+        factors = [
+            RiskFactor(label=f.label, score=round(s, 4), notes=n)
+            for f, s, n in zip(self.factors, scores.tolist(), notes)
+        ]
+        recommendations = [f.recommendation for f, s in zip(self.factors, scores) if s >= 0.5]
+        overall = float(scores @ self._importance)
+        return RiskAnalysisResponse(overall_score=round(overall, 4), factors=factors, recommendations=recommendations)
+
+    def analyze(self, text: str, jurisdiction: str = DOMESTIC_JURISDICTION) -> RiskAnalysisResponse:
+        return self.score(self.count(text), jurisdiction)
+
+    def _notes(self, counts: np.ndarray) -> List[str]:
+        """Per factor, the matched terms with the largest |weight x count|."""
+        found: List[List[Tuple[float, str]]] = [[] for _ in self.factors]
+        for term in np.flatnonzero(counts).tolist():
+            clause = self.lexicon[term]
+            n = int(counts[term])
+            found[self._term_factor[term]].append((-abs(clause.weight * n), f"{clause.term} ({n}x)"))
+        return [
+            "Termos: " + ", ".join(label for _, label in sorted(terms)[:TOP_TERMS_IN_NOTES])
+            if terms else "Nenhuma cláusula relevante encontrada."
+            for terms in found
+        ]
+
+
+class StreamingCounter:
+    """
+    Incremental `count()` for text that arrives in pieces.
+
+    Only the last `max_phrase_words - 1` tokens, plus a trailing partial word,
+    are carried between pieces. Memory stays bounded by the piece size, and a
+    clause split across two pieces is still matched exactly once.
+    """
+
+    def __init__(self, engine: LexiconRiskEngine) -> None:
+        self.engine = engine
+        self.counts = np.zeros(engine.n_terms, dtype=np.intp)
+        self._tokens: List[str] = []
+        self._carry = ""
+        self._next_free = 0
+
+    def feed(self, text: str) -> None:
+        text = self._carry + text
+        cut = TRAILING_WORD_RE.search(text).start()  # the last word may continue in the next piece
+        if len(text) - cut > MAX_CARRY_CHARS:
+            cut = len(text)
+        self._carry = text[cut:]
+        self._tokens.extend(tokenize(text[:cut]))
+        self._scan(len(self._tokens) - (self.engine.max_phrase_words - 1))
+
+    def finish(self) -> np.ndarray:
+        self._tokens.extend(tokenize(self._carry))
+        self._carry = ""
+        self._scan(len(self._tokens))
+        return self.counts
+
+    def _scan(self, stop: int) -> None:
+        if stop <= 0:
+            return
+        hits: List[int] = []
+        next_free = self.engine.scan(self._tokens, stop, self._next_free, hits)
+        if hits:
+            self.counts += self.engine.bincount(hits)
+        del self._tokens[:stop]
+        self._next_free = max(0, next_free - stop)
+
+
+class StaticRiskEngine:
+    """Fixed response used before the lexicon engine existed (demos, contract tests)."""
+
+    def analyze(self, text: str, jurisdiction: str = DOMESTIC_JURISDICTION) -> RiskAnalysisResponse:
+        factors = [
+            RiskFactor(label="LGPD", score=0.32, notes="Cláusulas de consentimento ok."),
+            RiskFactor(label="Trabalhista", score=0.58, notes="Verificar regime PJ x CLT."),
+            RiskFactor(label="Inadimplência", score=0.41, notes="Histórico positivo, porém sem garantia."),
+        ]
+        avg = sum(f.score for f in factors) / len(factors)
+        return RiskAnalysisResponse(
+            overall_score=avg,
+            factors=factors,
+            recommendations=["Adicionar cláusula de multa", "Detalhar política de dados pessoais"]
+        )
+
+
+ENGINES: Dict[str, type] = {
+    "heuristic": LexiconRiskEngine,
+    "static": StaticRiskEngine,
+}
+
+
+def build_risk_engine(model: str):
+    try:
+        return ENGINES[model.lower()]()
+    except KeyError:
+        raise ValueError(f"unknown RISK_MODEL: {model!r} (expected one of {sorted(ENGINES)})") from None
+
+
+@lru_cache
+def get_risk_engine():
+    return build_risk_engine(get_settings().risk_model)
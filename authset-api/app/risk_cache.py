@@ -0,0 +1,112 @@
+"""LRU + TTL cache for risk analyses.
+
+Contracts are mostly the same templates with different party names, so the key
+is a hash of the normalised `contract_text` plus the jurisdiction. `parties`
+never reaches the engine and stays out of the key. Normalisation is the same
+one the engine applies (case, accents, whitespace), so texts that differ only
+in those get the same key and the same result.
+
+The cache is bounded by an approximate byte budget (the serialised size of
+each response) rather than an entry count, because responses vary with the
+number of matched terms.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from .config import get_settings
+from .risk import normalize
+from .schemas import RiskAnalysisResponse
+
+ENTRY_OVERHEAD = 200  # key, OrderedDict node and tuple, roughly
+
+
+def cache_key(contract_text: str, jurisdiction: str) -> str:
+    canonical = " ".join(normalize(contract_text).split())
+    digest = hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+    return f"{jurisdiction.strip().upper()}:{digest}"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # dropped to stay within the byte budget
+    expirations: int = 0  # dropped because the TTL passed
+
+
+class RiskCache:
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._entries: "OrderedDict[str, Tuple[float, int, RiskAnalysisResponse]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: str) -> Optional[RiskAnalysisResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires_at, size, response = entry
+            if expires_at < time.monotonic():
+                self._drop(key, size)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return response
+
+    def put(self, key: str, response: RiskAnalysisResponse) -> None:
+        size = len(response.model_dump_json()) + len(key) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._drop(key, previous[1])
+            self._entries[key] = (time.monotonic() + self.ttl, size, response)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest, (_, oldest_size, _) = next(iter(self._entries.items()))
+                self._drop(oldest, oldest_size)
+                self.stats.evictions += 1
+
+    def _drop(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.stats.hits,
+                "misses": self.stats.misses,
+                "evictions": self.stats.evictions,
+                "expirations": self.stats.expirations,
+            }
+
+
+@lru_cache
+def get_risk_cache() -> RiskCache:
+    settings = get_settings()
+    return RiskCache(settings.risk_cache_bytes, settings.risk_cache_ttl)
@@ -0,0 +1,79 @@
+"""Process pool for batch risk analysis.
+
+Scoring is CPU-bound pure Python, so a batch on the event loop (or in the
+threadpool) is limited by the GIL to one core. The pool runs one engine per
+worker process. Contracts are sent in chunks to amortise IPC, and each chunk
+comes back as pre-serialised NDJSON lines so the parent only writes bytes.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Optional, Sequence, Tuple
+
+from .config import get_settings
+from .schemas import RiskAnalysisRequest, RiskBatchItem
+
+MAX_CHUNK = 64
+CHUNKS_PER_WORKER = 4  # enough chunks in flight to keep every worker busy
+
+_engine = None  # per worker process, built by the pool initializer
+
+
+def _init_worker(model: str) -> None:
+    global _engine
+    from .risk import build_risk_engine
+
+    _engine = build_risk_engine(model)
+
+
+def _analyze_chunk(chunk: Sequence[Tuple[int, str, str]]) -> bytes:
+    lines = []
+    for index, text, jurisdiction in chunk:
+        try:
+            item = RiskBatchItem(index=index, result=_engine.analyze(text, jurisdiction))
+        except Exception as exc:  # one bad contract must not sink the chunk
+            item = RiskBatchItem(index=index, error=str(exc))
+        lines.append(item.model_dump_json())
+    return ("\n".join(lines) + "\n").encode()
+
+
+class RiskPool:
+    def __init__(self, model: str, workers: Optional[int] = None) -> None:
+        self.workers = workers or os.cpu_count() or 1
+        # spawn: forking a process that already runs the event loop and SQLite pool is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model,),
+        )
+
+    def chunk_size(self, total: int) -> int:
+        return max(1, min(MAX_CHUNK, math.ceil(total / (self.workers * CHUNKS_PER_WORKER))))
+
+    async def analyze_ndjson(self, contracts: Sequence[Tuple[int, RiskAnalysisRequest]]) -> AsyncIterator[bytes]:
+        """Yield NDJSON chunks in completion order (each line carries its input `index`)."""
+        loop = asyncio.get_running_loop()
+        items = [(i, c.contract_text, c.jurisdiction) for i, c in contracts]
+        size = self.chunk_size(len(items))
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        futures = [loop.run_in_executor(self._executor, _analyze_chunk, chunk) for chunk in chunks]
+        try:
+            for finished in asyncio.as_completed(futures):
+                yield await finished
+        finally:
+            for future in futures:  # client went away: drop chunks not started yet
+                future.cancel()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+@lru_cache
+def get_risk_pool() -> RiskPool:
+    settings = get_settings()
+    return RiskPool(settings.risk_model, settings.risk_pool_workers or None)
@@ -1,12 +1,18 @@
 from datetime import datetime
-from typing import List
+from typing import Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
-from . import services
+from . import metrics, services
+from .config import get_settings
+from .ratelimit import client_ip
+from .responses import BodyStreamingResponse, fast
 from .schemas import (
     BLEIntentConfirm,
     BLEIntentRequest,
+    BLETrustBulkRequest,
+    BLETrustBulkResponse,
     BLETrustEntry,
     BLETrustRequest,
     BLETrustResponse,
@@ -15,8 +21,11 @@ from .schemas import (
     CaptchaSolveResponse,
     RiskAnalysisRequest,
     RiskAnalysisResponse,
+    RiskBatchRequest,
     VaultEntry,
     VaultEntryCreate,
+    VaultPage,
+    VaultType,
 )
 
 router = APIRouter()
@@ -24,73 +33,124 @@ router = APIRouter()
 
 @router.get("/health")
 def health_check():
-    return {"status": "ok", "timestamp": datetime.utcnow().isoformat()}
+    return fast({"status": "ok", "timestamp": datetime.utcnow().isoformat()})
+
+
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if not get_settings().metrics_enabled:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Not Found")
+    return PlainTextResponse(metrics.REGISTRY.expose(), media_type=metrics.CONTENT_TYPE)
 
 
 @router.post("/auth/ble/intent")
 def create_ble_intent(payload: BLEIntentRequest):
     intent = services.create_ble_intent(payload.device_id, payload.action)
-    return intent
+    return fast(intent)
 
 
 @router.post("/auth/ble/confirm")
 def confirm_ble(payload: BLEIntentConfirm):
     if not services.confirm_ble_intent(payload.intent_id, payload.signature):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "invalid intent or signature")
-    return {"status": "approved"}
+    return fast({"status": "approved"})
 
 
-@router.post("/auth/ble/trust", response_model=BLETrustResponse)
-def register_ble_trust(payload: BLETrustRequest):
-    entry = BLETrustEntry(
+@router.get("/auth/ble/intent/stats")
+def ble_intent_stats():
+    return fast(services.ble_intent_stats())
+
+
+def _trust_entry(payload: BLETrustRequest) -> BLETrustEntry:
+    return BLETrustEntry(
         owner_id=payload.owner_id,
         device_id=payload.device_id,
         alias=payload.alias,
         proximity_threshold=payload.proximity_threshold or 1.5,
     )
-    entries = services.upsert_ble_trust(entry)
-    return BLETrustResponse(entries=entries)
+
+
+@router.post("/auth/ble/trust", response_model=BLETrustResponse)
+def register_ble_trust(payload: BLETrustRequest):
+    entries = services.upsert_ble_trust(_trust_entry(payload))
+    return fast(BLETrustResponse(entries=entries))
+
+
+@router.post("/auth/ble/trust/bulk", response_model=BLETrustBulkResponse)
+def register_ble_trust_bulk(payload: BLETrustBulkRequest):
+    upserted = services.upsert_ble_trust_many([_trust_entry(p) for p in payload.entries])
+    return fast(BLETrustBulkResponse(upserted=upserted))
+
+
+@router.delete("/auth/ble/trust/{owner_id}/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_ble_trust(owner_id: str, device_id: str):
+    if not services.remove_ble_trust(owner_id, device_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "device not in trust circle")
 
 
 @router.get("/auth/ble/trust/{owner_id}", response_model=BLETrustResponse)
 def list_ble_trust(owner_id: str):
-    return BLETrustResponse(entries=services.list_ble_trust(owner_id))
+    return fast(BLETrustResponse(entries=services.list_ble_trust(owner_id)))
 
 
-@router.get("/vault/entries", response_model=List[VaultEntry])
-def vault_entries():
-    return services.list_vault_entries()
+@router.get("/vault/entries", response_model=VaultPage)
+def vault_entries(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    type: Optional[VaultType] = None,
+    updated_since: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+):
+    try:
+        return fast(services.query_vault_entries(limit, cursor, type, updated_since, updated_before))
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc))
 
 
 @router.post("/vault/entries", response_model=VaultEntry)
 def create_vault_entry(payload: VaultEntryCreate):
-    entry = VaultEntry(
-        id=payload.label.lower().replace(" ", "-"),
-        label=payload.label,
-        type=payload.type,
-        username=payload.username,
-        secret_hint="encrypted",
-        updated_at=datetime.utcnow(),
-    )
-    return services.add_vault_entry(entry)
+    return fast(services.create_vault_entry(payload))
 
 
 @router.post("/risk/analyze", response_model=RiskAnalysisResponse)
 def analyze_risk(payload: RiskAnalysisRequest):
-    return services.analyze_risk(payload)
+    return fast(services.analyze_risk(payload))
+
+
+@router.post("/risk/analyze/batch")
+async def analyze_risk_batch(payload: RiskBatchRequest):
+    # one JSON object per line ({"index", "result"|"error"}), in completion order
+    return StreamingResponse(services.analyze_risk_batch(payload.contracts), media_type="application/x-ndjson")
+
+
+@router.post("/risk/analyze/stream")
+async def analyze_risk_stream(request: Request, jurisdiction: str = "BR"):
+    # raw UTF-8 body (text/plain), scored as it arrives; NDJSON RiskStreamUpdate lines
+    if not services.supports_risk_streaming():
+        raise HTTPException(status.HTTP_501_NOT_IMPLEMENTED, "RISK_MODEL does not support streaming")
+    return BodyStreamingResponse(
+        services.analyze_risk_stream(request.stream(), jurisdiction), media_type="application/x-ndjson"
+    )
+
+
+@router.get("/risk/cache/stats")
+def risk_cache_stats():
+    return fast(services.risk_cache_stats())
 
 
 @router.post("/captcha/generate", response_model=CaptchaResponse)
 def captcha_generate():
-    # placeholder IA-friendly captcha
-    return CaptchaResponse(
-        captcha_id="demo",
-        prompt="Arraste o slider até alinhar o padrão.",
-        assets=[],
-    )
+    return fast(services.generate_captcha())
 
 
 @router.post("/captcha/solve", response_model=CaptchaSolveResponse)
-def captcha_solve(payload: CaptchaSolveRequest):
-    success = payload.answer.endswith("42")
-    return CaptchaSolveResponse(success=success, next_challenge_in=0 if success else 10)
+def captcha_solve(payload: CaptchaSolveRequest, request: Request):
+    # answer: slider offset in px; a failure costs one extra rate-limit attempt
+    success = services.solve_captcha(payload.captcha_id, payload.answer)
+    next_challenge_in = services.captcha_retry_after(client_ip(request.scope), success)
+    return CaptchaSolveResponse(success=success, next_challenge_in=next_challenge_in)
+
+
+@router.get("/captcha/stats")
+def captcha_stats():
+    return fast(services.captcha_stats())
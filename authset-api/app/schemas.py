@@ -21,6 +21,11 @@ class VaultEntry(BaseModel):
     updated_at: datetime
 
 
+class VaultPage(BaseModel):
+    entries: List[VaultEntry]
+    next_cursor: Optional[str] = None  # pass back as `cursor` for the next page; None on the last page
+
+
 class VaultEntryCreate(BaseModel):
     label: str
     type: VaultType
@@ -63,6 +68,14 @@ class BLETrustResponse(BaseModel):
     entries: List[BLETrustEntry]
 
 
+class BLETrustBulkRequest(BaseModel):
+    entries: List[BLETrustRequest] = Field(..., min_length=1, max_length=5000)
+
+
+class BLETrustBulkResponse(BaseModel):
+    upserted: int
+
+
 class RiskFactor(BaseModel):
     label: str
     score: float
@@ -81,10 +94,27 @@ class RiskAnalysisResponse(BaseModel):
     recommendations: List[str]
 
 
+class RiskStreamUpdate(BaseModel):
+    bytes_read: int
+    partial: bool  # false only on the last line, once the whole body was scored
+    result: RiskAnalysisResponse
+
+
+class RiskBatchRequest(BaseModel):
+    contracts: List[RiskAnalysisRequest] = Field(..., min_length=1, max_length=10000)
+
+
+class RiskBatchItem(BaseModel):
+    index: int  # position in RiskBatchRequest.contracts
+    result: Optional[RiskAnalysisResponse] = None
+    error: Optional[str] = None
+
+
 class CaptchaResponse(BaseModel):
     captcha_id: str
     prompt: str
-    assets: List[str] = Field(default_factory=list)
+    assets: List[str] = Field(default_factory=list)  # PNG data URIs: board with the notch, then the piece strip
+    expires_at: Optional[datetime] = None
 
 
 class CaptchaSolveRequest(BaseModel):
@@ -1,69 +1,306 @@
+import asyncio
+import base64
+import codecs
+import json
+import logging
+import math
+import re
 import secrets
-from datetime import datetime, timedelta
-from typing import Dict, List
+import time
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
+from .captcha import PROMPT as CAPTCHA_PROMPT, get_captcha_engine
+from .config import get_settings
+from .metrics import RISK_SECONDS
+from .ratelimit import CAPTCHA_SOLVE_PATH, FAILED_SOLVE_COST, charge, rate_limit_key, rate_limit_rules
+from .repositories import CaptchaAnswer, DuplicateKeyError, VaultKey, get_repositories
 from .schemas import (
     BLEIntent,
     BLETrustEntry,
+    CaptchaResponse,
     RiskAnalysisRequest,
     RiskAnalysisResponse,
-    RiskFactor,
+    RiskBatchItem,
+    RiskStreamUpdate,
     VaultEntry,
+    VaultEntryCreate,
+    VaultPage,
+    VaultType,
 )
 
-# In-memory stores (v0.1 placeholder)
-_vault: Dict[str, VaultEntry] = {}
-_ble_intents: Dict[str, BLEIntent] = {}
-_ble_trust: Dict[str, List[BLETrustEntry]] = {}
+logger = logging.getLogger(__name__)
 
 
 def create_ble_intent(device_id: str, action: str) -> BLEIntent:
     intent_id = secrets.token_hex(8)
     challenge = secrets.token_urlsafe(16)
-    expires_at = datetime.utcnow() + timedelta(minutes=2)
+    expires_at = datetime.utcnow() + timedelta(seconds=get_settings().ble_intent_ttl)
     intent = BLEIntent(intent_id=intent_id, challenge=challenge, expires_at=expires_at)
-    _ble_intents[intent_id] = intent
-    return intent
+    return get_repositories().ble_intents.add(intent, device_id, action)
 
 
 def confirm_ble_intent(intent_id: str, signature: str) -> bool:
-    intent = _ble_intents.get(intent_id)
+    # single use: any confirm attempt burns the intent, so a signature can't be brute-forced
+    intent = get_repositories().ble_intents.consume(intent_id)
     if not intent or intent.expires_at < datetime.utcnow():
         return False
     # Placeholder signature validation
     return signature.endswith(intent.challenge[:4])
 
 
+def ble_intent_stats() -> Dict[str, int]:
+    return get_repositories().ble_intents.stats()
+
+
+async def reap_expired(interval: float) -> None:
+    """Background task: drop expired intents, captcha answers and idle rate-limit keys."""
+    repositories = get_repositories()
+    stores = {
+        "BLE intent": repositories.ble_intents,
+        "captcha answer": repositories.captchas,
+        "rate limit": repositories.rate_limits,
+    }
+    while True:
+        await asyncio.sleep(interval)
+        for name, store in stores.items():
+            try:
+                await asyncio.to_thread(store.purge_expired, datetime.utcnow())
+            except Exception:
+                logger.exception("%s reaper failed", name)
+
+
 def upsert_ble_trust(entry: BLETrustEntry) -> List[BLETrustEntry]:
-    circle = _ble_trust.setdefault(entry.owner_id, [])
-    circle = [e for e in circle if e.device_id != entry.device_id]
-    circle.append(entry)
-    _ble_trust[entry.owner_id] = circle
-    return circle
+    return get_repositories().ble_trust.upsert(entry)
+
+
+def upsert_ble_trust_many(entries: List[BLETrustEntry]) -> int:
+    return get_repositories().ble_trust.upsert_many(entries)
+
+
+def remove_ble_trust(owner_id: str, device_id: str) -> bool:
+    return get_repositories().ble_trust.remove(owner_id, device_id)
 
 
 def list_ble_trust(owner_id: str) -> List[BLETrustEntry]:
-    return _ble_trust.get(owner_id, [])
+    return get_repositories().ble_trust.list(owner_id)
+
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    # stored timestamps are naive UTC (datetime.utcnow)
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
 
+def encode_vault_cursor(key: VaultKey) -> str:
+    raw = json.dumps([key[0].isoformat(), key[1]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-def list_vault_entries() -> List[VaultEntry]:
-    return list(_vault.values())
 
+def decode_vault_cursor(cursor: str) -> VaultKey:
+    try:
+        updated_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(updated_at), str(entry_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+
+def query_vault_entries(
+    limit: int,
+    cursor: Optional[str] = None,
+    type: Optional[VaultType] = None,
+    updated_since: Optional[datetime] = None,
+    updated_before: Optional[datetime] = None,
+) -> VaultPage:
+    after = decode_vault_cursor(cursor) if cursor else None
+    entries = get_repositories().vault.query(
+        limit + 1,  # one extra row tells whether there is a next page
+        type=type,
+        updated_since=_naive_utc(updated_since),
+        updated_before=_naive_utc(updated_before),
+        after=after,
+    )
+    if len(entries) <= limit:
+        return VaultPage(entries=entries)
+    last = entries[limit - 1]
+    return VaultPage(entries=entries[:limit], next_cursor=encode_vault_cursor((last.updated_at, last.id)))
 
-def add_vault_entry(entry: VaultEntry) -> VaultEntry:
-    _vault[entry.id] = entry
-    return entry
+
+def _vault_slug(label: str) -> str:
+    ascii_label = unicodedata.normalize("NFKD", label).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_label.lower()).strip("-") or "entry"
+
+
+def create_vault_entry(payload: VaultEntryCreate) -> VaultEntry:
+    # label slug + random suffix: same-named entries no longer overwrite each other
+    slug = _vault_slug(payload.label)
+    while True:
+        entry = VaultEntry(
+            id=f"{slug}-{secrets.token_hex(4)}",
+            label=payload.label,
+            type=payload.type,
+            username=payload.username,
+            secret_hint="encrypted",
+            updated_at=datetime.utcnow(),
+        )
+        try:
+            return get_repositories().vault.add(entry)
+        except DuplicateKeyError:
+            continue
+
+
+# The risk modules (NumPy, lexicon tables, process pool) are imported on first
+# use rather than at module level, so workers that never score a contract do
+# not pay for them at boot.
+
+
+def _run_risk_engine(payload: RiskAnalysisRequest) -> RiskAnalysisResponse:
+    from .risk import get_risk_engine
+
+    started = time.perf_counter()
+    result = get_risk_engine().analyze(payload.contract_text, payload.jurisdiction)
+    RISK_SECONDS.observe(time.perf_counter() - started, (("model", get_settings().risk_model),))
+    return result
 
 
 def analyze_risk(payload: RiskAnalysisRequest) -> RiskAnalysisResponse:
-    factors = [
-        RiskFactor(label="LGPD", score=0.32, notes="Cláusulas de consentimento ok."),
-        RiskFactor(label="Trabalhista", score=0.58, notes="Verificar regime PJ x CLT."),
-        RiskFactor(label="Inadimplência", score=0.41, notes="Histórico positivo, porém sem garantia."),
-    ]
-    avg = sum(f.score for f in factors) / len(factors)
-    return RiskAnalysisResponse(
-        overall_score=avg,
-        factors=factors,
-        recommendations=["Adicionar cláusula de multa", "Detalhar política de dados pessoais"]
+    from .risk_cache import cache_key, get_risk_cache
+
+    cache = get_risk_cache()
+    if not cache.enabled:
+        return _run_risk_engine(payload)
+    key = cache_key(payload.contract_text, payload.jurisdiction)
+    result = cache.get(key)
+    if result is None:
+        result = _run_risk_engine(payload)
+        cache.put(key, result)
+    return result
+
+
+def _lookup_batch(contracts: List[RiskAnalysisRequest]) -> List[Tuple[str, Optional[RiskAnalysisResponse]]]:
+    from .risk_cache import cache_key, get_risk_cache
+
+    cache = get_risk_cache()
+    keys = [cache_key(c.contract_text, c.jurisdiction) for c in contracts]
+    return [(key, cache.get(key)) for key in keys]
+
+
+def _store_batch_chunk(chunk: bytes, keys: List[str]) -> None:
+    from .risk_cache import get_risk_cache
+
+    cache = get_risk_cache()
+    for line in chunk.splitlines():
+        item = RiskBatchItem.model_validate_json(line)
+        if item.result is not None:
+            cache.put(keys[item.index], item.result)
+
+
+async def analyze_risk_batch(contracts: List[RiskAnalysisRequest]) -> AsyncIterator[bytes]:
+    # cached contracts are answered first; only the misses go to the process pool.
+    # Hashing up to a full batch of texts and re-parsing results would stall the
+    # event loop, so both run in the threadpool.
+    from .risk_cache import get_risk_cache
+    from .risk_pool import get_risk_pool
+
+    cache_enabled = get_risk_cache().enabled
+    lookups = await asyncio.to_thread(_lookup_batch, contracts) if cache_enabled else []
+    keys = [key for key, _ in lookups]
+    pending = []
+    for index, contract in enumerate(contracts):
+        cached = lookups[index][1] if cache_enabled else None
+        if cached is None:
+            pending.append((index, contract))
+        else:
+            yield RiskBatchItem(index=index, result=cached).model_dump_json().encode() + b"\n"
+    if pending:
+        async for chunk in get_risk_pool().analyze_ndjson(pending):
+            if cache_enabled:
+                await asyncio.to_thread(_store_batch_chunk, chunk, keys)
+            yield chunk
+
+
+def supports_risk_streaming() -> bool:
+    from .risk import LexiconRiskEngine, get_risk_engine
+
+    return isinstance(get_risk_engine(), LexiconRiskEngine)
+
+
+async def analyze_risk_stream(body: AsyncIterator[bytes], jurisdiction: str) -> AsyncIterator[bytes]:
+    """Score a UTF-8 body chunk by chunk, emitting a partial result per chunk and a final one."""
+    from .risk import get_risk_engine
+
+    engine = get_risk_engine()
+    counter = engine.stream_counter()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunk_bytes = get_settings().risk_stream_chunk_bytes
+    pending: List[bytes] = []
+    pending_size = bytes_read = 0
+
+    def update(partial: bool) -> bytes:
+        result = engine.score(counter.counts, jurisdiction)
+        line = RiskStreamUpdate(bytes_read=bytes_read, partial=partial, result=result)
+        return line.model_dump_json().encode() + b"\n"
+
+    async for piece in body:
+        pending.append(piece)
+        pending_size += len(piece)
+        if pending_size < chunk_bytes:
+            continue
+        data = b"".join(pending)
+        cut = len(data) - len(data) % chunk_bytes
+        pending[:] = [data[cut:]] if cut < len(data) else []
+        pending_size = len(data) - cut
+        for start in range(0, cut, chunk_bytes):  # the server may hand over pieces larger than a chunk
+            bytes_read += chunk_bytes
+            await asyncio.to_thread(counter.feed, decoder.decode(data[start:start + chunk_bytes]))
+            yield update(partial=True)
+
+    bytes_read += pending_size
+    counter.feed(decoder.decode(b"".join(pending), final=True))
+    counter.finish()
+    yield update(partial=False)
+
+
+def risk_cache_stats() -> Dict[str, int]:
+    from .risk_cache import get_risk_cache
+
+    return get_risk_cache().snapshot()
+
+
+def generate_captcha() -> CaptchaResponse:
+    challenge = get_captcha_engine().take()
+    captcha_id = secrets.token_urlsafe(12)
+    expires_at = datetime.utcnow() + timedelta(seconds=get_settings().captcha_ttl)
+    get_repositories().captchas.add(captcha_id, CaptchaAnswer(challenge.answer, expires_at))
+    return CaptchaResponse(
+        captcha_id=captcha_id, prompt=CAPTCHA_PROMPT, assets=list(challenge.assets), expires_at=expires_at
     )
+
+
+def solve_captcha(captcha_id: str, answer: str) -> bool:
+    # single use: a wrong answer burns the captcha, so offsets can't be scanned
+    expected = get_repositories().captchas.consume(captcha_id)
+    if expected is None or expected.expires_at < datetime.utcnow():
+        return False
+    try:
+        offset = round(float(answer))
+    except (ValueError, OverflowError):
+        return False
+    return abs(offset - expected.answer) <= get_settings().captcha_tolerance
+
+
+def captcha_retry_after(client_ip: str, solved: bool) -> int:
+    """Seconds before this client may try another captcha, from its rate-limit state."""
+    settings = get_settings()
+    if solved or not settings.rate_limit_enabled:
+        return 0
+    rule = rate_limit_rules(settings)[CAPTCHA_SOLVE_PATH]
+    key = rate_limit_key(CAPTCHA_SOLVE_PATH, "ip", client_ip)
+    _, retry_after = charge([key], rule, cost=FAILED_SOLVE_COST, force=True)
+    return math.ceil(retry_after)
+
+
+def captcha_stats() -> Dict[str, int]:
+    return {**get_captcha_engine().snapshot(), **get_repositories().captchas.stats()}
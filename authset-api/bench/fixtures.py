@@ -0,0 +1,39 @@
+"""Data shared by the benchmarks: contract templates and a seeded app state."""
+
+import httpx
+
+TRUST_OWNERS = 20
+TRUST_DEVICES = 50  # per owner
+VAULT_ENTRIES = 500
+VAULT_TYPES = ("credential", "otp", "streaming", "contract")
+
+# a few templates: real traffic repeats the same contract models with other parties
+CONTRACTS = (
+    (
+        "O contratante autoriza o tratamento de dados pessoais conforme a LGPD. "
+        "Em caso de inadimplência incidirá multa de 20% sobre o valor devido. "
+        "Fica eleito o foro da comarca de São Paulo. "
+    ) * 10,
+    (
+        "O prestador não possui vínculo empregatício com a contratante e responde pelos encargos trabalhistas. "
+        "A multa rescisória fica limitada ao valor de um mês de serviço. "
+        "As partes elegem o foro de Nova York para dirimir controvérsias. "
+    ) * 20,
+    (
+        "O locatário pagará juros de mora de 1% ao mês e multa de 10% em caso de atraso. "
+        "Os dados pessoais do fiador serão compartilhados com birôs de crédito. "
+    ) * 40,
+)
+
+
+async def seed(client: httpx.AsyncClient) -> None:
+    """Trust circles for TRUST_OWNERS owners ("owner-<n>") and VAULT_ENTRIES vault entries."""
+    entries = [
+        {"owner_id": f"owner-{owner}", "device_id": f"device-{device}", "alias": f"Device {device}"}
+        for owner in range(TRUST_OWNERS)
+        for device in range(TRUST_DEVICES)
+    ]
+    (await client.post("/auth/ble/trust/bulk", json={"entries": entries})).raise_for_status()
+    for i in range(VAULT_ENTRIES):
+        body = {"label": f"Conta {i}", "type": VAULT_TYPES[i % len(VAULT_TYPES)], "username": "bench", "payload": "x"}
+        (await client.post("/vault/entries", json=body)).raise_for_status()
@@ -0,0 +1,247 @@
+"""Load test: latency percentiles and throughput per scenario.
+
+Boots `create_app()` in-process, lifespan included, behind httpx's ASGI
+transport and replays each scenario with `--concurrency` concurrent clients.
+The report (p50/p95/p99 per route, RPS per scenario, commit and settings) is
+written as JSON so runs can be diffed between commits:
+
+    cd authset-api
+    python -m bench.load --concurrency 16 --operations 2000 --output load-before.json
+    ... change things ...
+    python -m bench.load --concurrency 16 --operations 2000 --baseline load-before.json
+
+Settings come from the environment as usual (STORAGE_BACKEND=sqlite,
+FAST_RESPONSES=true, ...). Every simulated client shares one IP, so the rate
+limiter is off unless RATE_LIMIT_ENABLED is set explicitly.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from .fixtures import CONTRACTS, TRUST_DEVICES, TRUST_OWNERS, VAULT_TYPES, seed
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+class Recorder:
+    """Latency samples and error counts per route."""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[route].append(time.perf_counter() - started)
+        if response.is_error:
+            self.errors[route] += 1
+        return response
+
+
+# one operation of a scenario: may issue several requests
+Scenario = Callable[[httpx.AsyncClient, random.Random, Recorder], Awaitable[None]]
+
+
+async def ble_cycle(client: httpx.AsyncClient, rng: random.Random, recorder: Recorder) -> None:
+    device_id = f"device-{rng.randrange(TRUST_DEVICES)}"
+    response = await recorder.request(
+        client, "POST /auth/ble/intent", "POST", "/auth/ble/intent", json={"device_id": device_id, "action": "login"}
+    )
+    if response.is_error:
+        return
+    intent = response.json()
+    body = {"intent_id": intent["intent_id"], "device_id": device_id, "signature": f"sig-{intent['challenge'][:4]}"}
+    await recorder.request(client, "POST /auth/ble/confirm", "POST", "/auth/ble/confirm", json=body)
+
+
+async def trust_upsert(client: httpx.AsyncClient, rng: random.Random, recorder: Recorder) -> None:
+    body = {
+        "owner_id": f"owner-{rng.randrange(TRUST_OWNERS)}",
+        "device_id": f"device-{rng.randrange(TRUST_DEVICES * 2)}",  # half of them new devices
+        "alias": "bench",
+        "proximity_threshold": round(rng.uniform(0.5, 3.0), 1),
+    }
+    await recorder.request(client, "POST /auth/ble/trust", "POST", "/auth/ble/trust", json=body)
+
+
+async def vault_list(client: httpx.AsyncClient, rng: random.Random, recorder: Recorder) -> None:
+    params = {"limit": 50}
+    if rng.random() < 0.5:
+        params["type"] = rng.choice(VAULT_TYPES)
+    response = await recorder.request(client, "GET /vault/entries", "GET", "/vault/entries", params=params)
+    cursor = None if response.is_error else response.json()["next_cursor"]
+    if cursor:  # clients usually scroll one more page
+        await recorder.request(
+            client, "GET /vault/entries", "GET", "/vault/entries", params={**params, "cursor": cursor}
+        )
+
+
+async def risk_analyze(client: httpx.AsyncClient, rng: random.Random, recorder: Recorder) -> None:
+    body = {
+        "contract_text": rng.choice(CONTRACTS),
+        "jurisdiction": "BR" if rng.random() < 0.9 else "US",
+        "parties": [f"Parte {rng.randrange(1000)}", f"Parte {rng.randrange(1000)}"],
+    }
+    await recorder.request(client, "POST /risk/analyze", "POST", "/risk/analyze", json=body)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "ble_cycle": ble_cycle,
+    "trust_upsert": trust_upsert,
+    "vault_list": vault_list,
+    "risk_analyze": risk_analyze,
+}
+
+
+def _summary(samples: List[float], errors: int) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, operations: int, concurrency: int, seed_value: int
+) -> Dict:
+    recorder = Recorder()
+    remaining = iter(range(operations))
+
+    async def worker(worker_id: int) -> None:
+        rng = random.Random(seed_value * 1000 + worker_id)
+        for _ in remaining:  # shared iterator: workers pull operations until it runs out
+            await scenario(client, rng, recorder)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in recorder.latencies.values() for sample in samples]
+    return {
+        "operations": operations,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(all_samples) / elapsed, 1),
+        **_summary(all_samples, sum(recorder.errors.values())),
+        "routes": {
+            route: _summary(samples, recorder.errors[route]) for route, samples in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def run(names: List[str], operations: int, concurrency: int, warmup: int, seed_value: int) -> Dict:
+    from app.config import get_settings
+    from app.main import create_app
+
+    settings = get_settings()
+    app = create_app()
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "storage_backend": settings.storage_backend,
+            "fast_responses": settings.fast_responses,
+            "risk_model": settings.risk_model,
+            "rate_limit": settings.rate_limit_enabled,
+            "concurrency": concurrency,
+            "operations": operations,
+        },
+        "scenarios": {},
+    }
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await seed(client)
+            for name in names:
+                if warmup:
+                    await run_scenario(client, SCENARIOS[name], warmup, concurrency, seed_value - 1)
+                report["scenarios"][name] = await run_scenario(
+                    client, SCENARIOS[name], operations, concurrency, seed_value
+                )
+    return report
+
+
+def _delta(current: float, previous: float) -> str:
+    return f"{current / previous - 1:+.1%}" if previous else "n/a"
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None) -> None:
+    meta = report["meta"]
+    print(
+        f"commit {meta['commit']}  backend {meta['storage_backend']}  fast {meta['fast_responses']}  "
+        f"concurrency {meta['concurrency']}"
+    )
+    header = f"{'scenario / route':34} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    if baseline:
+        print(f"deltas against {baseline['meta']['commit']} ({baseline['meta']['timestamp']})")
+        header += f" {'Δrps':>7} {'Δp95':>7} {'Δp99':>7}"
+    print(header)
+    for name, result in report["scenarios"].items():
+        previous = (baseline or {}).get("scenarios", {}).get(name)
+        rows = [(name, result, previous, f"{result['rps']:.0f}")]
+        for route, stats in result["routes"].items():
+            rows.append((f"  {route}", stats, previous and previous["routes"].get(route), ""))
+        for label, stats, before, rps in rows:
+            line = (
+                f"{label:34} {rps:>9} {stats['p50_ms']:8.2f} {stats['p95_ms']:8.2f} {stats['p99_ms']:8.2f} "
+                f"{stats['errors']:7d}"
+            )
+            if before:
+                rps_delta = _delta(result["rps"], before["rps"]) if rps else ""
+                p95_delta = _delta(stats["p95_ms"], before["p95_ms"])
+                line += f" {rps_delta:>7} {p95_delta:>7} {_delta(stats['p99_ms'], before['p99_ms']):>7}"
+            print(line)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--operations", type=int, default=2000, help="operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=200, help="untimed operations before each scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args.scenarios, args.operations, args.concurrency, args.warmup, args.seed))
+    with open(args.output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    print_report(report, baseline)
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-request cost of MetricsMiddleware.
+
+Drives a no-op ASGI app directly, with and without the middleware, so the
+difference is the middleware alone: status capture, in-flight gauge, histogram
+observe and counter increment. Exits non-zero when the added latency exceeds
+the budget, so it can gate CI.
+
+    cd authset-api
+    python -m bench.metrics_overhead --requests 200000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+from typing import List
+
+from app.metrics import MetricsMiddleware
+
+BUDGET_US = 20.0
+ROUTES = [SimpleNamespace(path=f"/bench/{i}/{{item_id}}") for i in range(20)]  # 20 label sets, like a real router
+
+START = {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]}
+BODY = {"type": "http.response.body", "body": b'{"status":"ok"}'}
+
+
+async def endpoint(scope, receive, send) -> None:
+    scope["route"] = ROUTES[scope["_index"] % len(ROUTES)]  # what the router sets on a match
+    await send(START)
+    await send(BODY)
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _per_request_us(app, count: int) -> float:
+    scopes = [{"type": "http", "method": "GET", "path": "/bench", "_index": i} for i in range(count)]
+    started = time.perf_counter()
+    for scope in scopes:
+        await app(scope, _receive, _send)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def _run(count: int, rounds: int) -> List[float]:
+    instrumented = MetricsMiddleware(endpoint)
+    await _per_request_us(endpoint, count // 10)  # warm up
+    await _per_request_us(instrumented, count // 10)
+    added = []
+    for _ in range(rounds):
+        bare = await _per_request_us(endpoint, count)
+        added.append(await _per_request_us(instrumented, count) - bare)
+    return added
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100000, help="requests per round and variant")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--budget-us", type=float, default=BUDGET_US)
+    args = parser.parse_args(argv)
+
+    added = asyncio.run(_run(args.requests, args.rounds))
+    median = statistics.median(added)
+    spread = f"min {min(added):.2f}µs, max {max(added):.2f}µs"
+    print(f"added per request: median {median:.2f}µs, {spread} (budget {args.budget_us:.0f}µs)")
+    if median > args.budget_us:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
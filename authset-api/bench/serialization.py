@@ -0,0 +1,95 @@
+"""Requests/second per endpoint with FAST_RESPONSES off vs on.
+
+In-process over httpx's ASGI transport, so the numbers isolate the app
+(routing, validation, serialisation) from sockets and uvicorn. Both modes
+run against the same app and data, alternating round by round, and the
+median round is reported to damp machine noise. The rate limiter is off
+unless RATE_LIMIT_ENABLED is set: every request comes from one client.
+
+    cd authset-api
+    python -m bench.serialization --requests 1000 --rounds 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from .fixtures import CONTRACTS, seed
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# method, path, JSON body (None for GET)
+Endpoint = Tuple[str, str, object]
+
+WARMUP = 100
+
+
+def _endpoints() -> Dict[str, Callable[[int], Endpoint]]:
+    from app import services
+
+    def confirm(i: int) -> Endpoint:
+        # confirm burns its intent, so every request gets a fresh one
+        intent = services.create_ble_intent(f"d{i}", "login")
+        body = {"intent_id": intent.intent_id, "device_id": f"d{i}", "signature": f"sig-{intent.challenge[:4]}"}
+        return "POST", "/auth/ble/confirm", body
+
+    return {
+        "GET /health": lambda i: ("GET", "/health", None),
+        "POST /auth/ble/intent": lambda i: ("POST", "/auth/ble/intent", {"device_id": f"d{i}", "action": "login"}),
+        "POST /auth/ble/confirm": confirm,
+        "GET /auth/ble/trust/{owner}": lambda i: ("GET", "/auth/ble/trust/owner-0", None),
+        "GET /vault/entries": lambda i: ("GET", "/vault/entries?limit=50", None),
+        "POST /risk/analyze": lambda i: ("POST", "/risk/analyze", {"contract_text": CONTRACTS[0]}),
+    }
+
+
+async def _rps(client: httpx.AsyncClient, request: Callable[[int], Endpoint], count: int) -> float:
+    # requests are built up front so only the app is timed
+    requests = [request(i) for i in range(count)]
+    started = time.perf_counter()
+    for method, path, body in requests:
+        response = await client.request(method, path, json=body)
+        response.raise_for_status()
+    return count / (time.perf_counter() - started)
+
+
+async def _run(count: int, rounds: int) -> Dict[str, Tuple[float, float]]:
+    from app.config import get_settings
+    from app.main import create_app
+
+    settings = get_settings()
+    results = {}
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await seed(client)
+        for name, request in _endpoints().items():
+            samples = {False: [], True: []}
+            for fast in itertools.islice(itertools.cycle((False, True)), 2 * rounds + 2):
+                settings.fast_responses = fast
+                rps = await _rps(client, request, WARMUP if not samples[fast] else count)
+                samples[fast].append(rps)
+            # first sample of each mode is the warm-up round
+            results[name] = (statistics.median(samples[False][1:]), statistics.median(samples[True][1:]))
+    return results
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint, mode and round")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(_run(args.requests, args.rounds))
+    print(f"{'endpoint':32} {'default rps':>12} {'fast rps':>10} {'gain':>7}")
+    for name, (baseline, fast) in results.items():
+        print(f"{name:32} {baseline:12.0f} {fast:10.0f} {fast / baseline - 1:+7.1%}")
+
+
+if __name__ == "__main__":
+    main()
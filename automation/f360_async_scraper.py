@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+F360 Async Token Scraper - Versão asyncio do pipeline de tokens
+
+Mesmo fluxo do F360TokenScraper (login > integrações > webhook > token), mas
+usando playwright.async_api para sobrepor as esperas de rede de vários
+clientes em um único processo:
+- Um único Chromium compartilhado por todos os clientes
+- Um contexto isolado (cookies/sessão) por cliente, reaproveitando a sessão
+  em cache (f360_session_cache) quando ainda válida
+- Fan-out limitado por asyncio.Semaphore (--concurrency)
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from playwright.async_api import async_playwright, Browser, Page
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import f360_token_scraper
+from f360_token_scraper import (
+    CADASTRO_SELECTORS,
+    CONTEXT_OPTIONS,
+    CRIAR_SELECTORS,
+    EMAIL_SELECTORS,
+    F360_URL,
+    INTEGRACAO_SELECTORS,
+    LOGIN_BUTTON_SELECTORS,
+    RECAPTCHA_SELECTORS,
+    SENHA_SELECTORS,
+    TIMEOUT,
+    TOKEN_SELECTORS,
+    WAIT_BETWEEN_CLIENTS,
+    WEBHOOK_SELECTORS,
+    F360ScraperBase,
+    logger,
+)
+from f360_request_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, RequestBlocker
+from f360_session_cache import SESSION_TTL, SessionCache
+from f360_token_capture import HEX_TOKEN_RE, UUID_RE, ResponseTokenCapture
+from f360_readiness import (
+    DIALOG_TIMEOUT,
+    MODAL_SELECTORS,
+    PAGE_TIMEOUT,
+    TOKEN_DIALOG_SELECTORS,
+    ReadinessTimeout,
+    any_of,
+    wait_for_any_async,
+    wait_for_login_exit_async,
+    wait_for_recaptcha_async,
+)
+
+DEFAULT_CONCURRENCY = 10  # sessões F360 simultâneas
+
+
+class AsyncF360TokenScraper(F360ScraperBase):
+    """
+    Variante asyncio do F360TokenScraper.
+
+    Os passos (login, navigate_to_integrations, create_webhook, extract_token)
+    são corrotinas que recebem a página do cliente, já que várias sessões
+    ficam em andamento ao mesmo tempo. CSV, journal, token store, relatório e
+    run() vêm de F360ScraperBase, a mesma base da versão síncrona.
+    """
+
+    def __init__(self, headless: bool = True, concurrency: int = DEFAULT_CONCURRENCY,
+                 journal_path: Optional[Path] = None, resume: bool = False,
+                 session_cache: Optional[SessionCache] = None,
+                 blocker: Optional[RequestBlocker] = None,
+                 token_store_path: Optional[Path] = None):
+        super().__init__(headless=headless, journal_path=journal_path, resume=resume,
+                         session_cache=session_cache, blocker=blocker, token_store_path=token_store_path)
+        self.concurrency = max(1, concurrency)
+        self.async_browser: Optional[Browser] = None
+
+    async def login(self, page: Page, email: str, senha: str) -> bool:
+        """
+        Passo 1: Fazer login no F360
+        """
+        try:
+            logger.info(f"  → [{email}] Acessando página de login...")
+            await page.goto(F360_URL, wait_until="domcontentloaded", timeout=TIMEOUT)
+
+            email_input = await wait_for_any_async(page, EMAIL_SELECTORS, "Campo de email")
+            await email_input.fill(email)
+
+            senha_input = await wait_for_any_async(page, SENHA_SELECTORS, "Campo de senha")
+            await senha_input.fill(senha)
+
+            # Verificar se há reCAPTCHA
+            recaptcha_exists = False
+            for recaptcha_selector in RECAPTCHA_SELECTORS:
+                if await page.query_selector(recaptcha_selector):
+                    recaptcha_exists = True
+                    break
+
+            if recaptcha_exists:
+                logger.warning(f"  ⚠️  [{email}] reCAPTCHA detectado - aguardando resolução...")
+                if not await wait_for_recaptcha_async(page):
+                    logger.warning(f"  ⚠️  [{email}] reCAPTCHA não resolvido no prazo - tentando login mesmo assim")
+
+            try:
+                login_button = await wait_for_any_async(page, LOGIN_BUTTON_SELECTORS, "Botão de login", timeout=3000)
+                await login_button.click()
+            except ReadinessTimeout:
+                logger.info(f"  → [{email}] Botão de login não encontrado, pressionando ENTER...")
+                await page.keyboard.press('Enter')
+
+            # Aguardar o formulário sumir ou o F360 exibir erro
+            if not await wait_for_login_exit_async(page):
+                logger.error(f"  ❌ [{email}] Login falhou - credenciais inválidas")
+                return False
+
+            logger.info(f"  ✅ [{email}] Login realizado com sucesso")
+            return True
+
+        except Exception as e:
+            logger.error(f"  ❌ [{email}] Erro no login: {str(e)}")
+            return False
+
+    async def navigate_to_integrations(self, page: Page) -> bool:
+        """
+        Passo 2 e 3: Navegar até Menu Cadastro > Integrações
+        """
+        try:
+            # Primeiro, tentar URLs diretas (prontas quando o botão CRIAR aparece)
+            for path in ("/Webservice", "/integracao"):
+                try:
+                    await page.goto(f"{F360_URL}{path}", wait_until="domcontentloaded", timeout=TIMEOUT)
+                    await wait_for_any_async(page, CRIAR_SELECTORS, "Botão CRIAR", timeout=PAGE_TIMEOUT)
+                    logger.info(f"  ✅ Acessou {path} diretamente")
+                    return True
+                except Exception:
+                    logger.info(f"  → URL {path} não funcionou...")
+
+            # Se URLs diretas não funcionarem, tentar via menu
+            try:
+                await (await wait_for_any_async(page, CADASTRO_SELECTORS, "Menu Cadastro")).click()
+                await (await wait_for_any_async(page, INTEGRACAO_SELECTORS, "Integrações")).click()
+            except ReadinessTimeout as e:
+                logger.error(f"  ❌ {str(e)}")
+                return False
+
+            await wait_for_any_async(page, CRIAR_SELECTORS, "Botão CRIAR", timeout=PAGE_TIMEOUT)
+            logger.info(f"  ✅ Navegação para Integrações concluída")
+            return True
+
+        except Exception as e:
+            logger.error(f"  ❌ Erro na navegação: {str(e)}")
+            return False
+
+    async def create_webhook(self, page: Page, capture: Optional[ResponseTokenCapture] = None) -> bool:
+        """
+        Passo 4 e 5: Clicar em CRIAR e selecionar Webhook API Pública 360
+        """
+        try:
+            try:
+                await (await wait_for_any_async(page, CRIAR_SELECTORS, "Botão CRIAR")).click()
+            except ReadinessTimeout:
+                logger.error(f"  ❌ Botão CRIAR não encontrado")
+                return False
+
+            # Aguardar modal/formulário aparecer
+            await wait_for_any_async(page, MODAL_SELECTORS, "Modal de criação", timeout=DIALOG_TIMEOUT)
+
+            webhook_found = False
+
+            # A seleção cria o webhook: só respostas a partir daqui podem trazer o token
+            if capture:
+                capture.arm()
+
+            # Tentar via select
+            try:
+                if await page.query_selector('select'):
+                    await page.select_option('select', label='Webhook API Pública 360')
+                    webhook_found = True
+            except Exception:
+                pass
+
+            # Se não encontrou via select, tentar clicar em elemento com texto
+            if not webhook_found:
+                try:
+                    option = await wait_for_any_async(page, WEBHOOK_SELECTORS, "Opção Webhook API Pública 360", timeout=3000)
+                    await option.click()
+                    webhook_found = True
+                except ReadinessTimeout:
+                    pass
+
+            if not webhook_found:
+                logger.error(f"  ❌ Webhook API Pública 360 não encontrado")
+                return False
+
+            # Aguardar diálogo com o token, a menos que a resposta de rede já o tenha trazido
+            # (extract_token ainda faz fallback no DOM)
+            if not (capture and await capture.token_async()):
+                try:
+                    await wait_for_any_async(page, TOKEN_DIALOG_SELECTORS, "Diálogo do token", timeout=DIALOG_TIMEOUT)
+                except ReadinessTimeout as e:
+                    logger.warning(f"  ⚠️  {str(e)}")
+
+            logger.info(f"  ✅ Webhook criado")
+            return True
+
+        except Exception as e:
+            logger.error(f"  ❌ Erro ao criar webhook: {str(e)}")
+            return False
+
+    async def extract_token(self, page: Page, capture: Optional[ResponseTokenCapture] = None) -> Optional[str]:
+        """
+        Passo 6: Copiar o token gerado (resposta de rede primeiro, DOM como fallback)
+        """
+        try:
+            token = await capture.token_async() if capture else None
+            if token:
+                logger.info(f"  ✅ Token capturado da resposta de rede: {token[:8]}...{token[-8:]}")
+                return token
+
+            for selector in TOKEN_SELECTORS:
+                try:
+                    for element in await page.query_selector_all(selector):
+                        text = (
+                            await element.get_attribute('value')
+                            or await element.inner_text()
+                            or await element.text_content()
+                        )
+                        if not text:
+                            continue
+                        match = UUID_RE.search(text) or HEX_TOKEN_RE.search(text)
+                        if match:
+                            token = match.group(0)
+                            logger.info(f"  ✅ Token encontrado: {token[:8]}...{token[-8:]}")
+                            return token
+                except Exception:
+                    continue
+
+            # Se não encontrou, buscar em todo o conteúdo da página
+            match = UUID_RE.search(await page.content())
+            if match:
+                token = match.group(0)
+                logger.info(f"  ✅ Token encontrado no HTML: {token[:8]}...{token[-8:]}")
+                return token
+
+            logger.error(f"  ❌ Token não encontrado na página")
+            return None
+
+        except Exception as e:
+            logger.error(f"  ❌ Erro ao extrair token: {str(e)}")
+            return None
+
+    async def open_context(self, storage_state: Optional[Dict] = None) -> Tuple[Page, ResponseTokenCapture]:
+        """Abre um contexto isolado (autenticado se houver storage_state) com captura de token"""
+        context = await self.async_browser.new_context(storage_state=storage_state, **CONTEXT_OPTIONS)
+        await self.blocker.install_async(context)
+        page = await context.new_page()
+        return page, ResponseTokenCapture(page)
+
+    async def restore_session(self, page: Page) -> bool:
+        """Abre /Webservice com a sessão em cache; False se o F360 redirecionar para o login"""
+        try:
+            await page.goto(f"{F360_URL}/Webservice", wait_until="domcontentloaded", timeout=TIMEOUT)
+            await wait_for_any_async(page, CRIAR_SELECTORS + SENHA_SELECTORS, "Página autenticada", timeout=PAGE_TIMEOUT)
+            if 'login' in page.url.lower():
+                return False
+            return not await any_of(page, SENHA_SELECTORS).is_visible()
+        except Exception as e:
+            logger.info(f"  → Sessão em cache não pôde ser reaproveitada: {str(e)}")
+            return False
+
+    async def process_client(self, cliente_data: Dict) -> Tuple[bool, Optional[str]]:
+        """
+        Processa um cliente completo em um contexto dedicado a ele
+        """
+        email = cliente_data.get('Login', '').strip()
+        senha = cliente_data.get('Senha', '').strip()
+
+        if not email or not senha:
+            logger.warning(f"  ⚠️  Cliente sem email ou senha: {cliente_data.get('Razão Social', '').strip()}")
+            return False, None
+
+        storage_state = self.session_cache.get(email)
+        page, capture = await self.open_context(storage_state)
+        try:
+            autenticado = False
+            if storage_state:
+                autenticado = await self.restore_session(page)
+                if not autenticado:
+                    logger.info(f"  → [{email}] Sessão expirada no F360, refazendo login...")
+                    self.session_cache.invalidate(email)
+                    await page.context.close()
+                    page, capture = await self.open_context()
+
+            if not autenticado:
+                if not await self.login(page, email, senha):
+                    return False, None
+                self.session_cache.save(email, await page.context.storage_state())
+                if not await self.navigate_to_integrations(page):
+                    return False, None
+
+            if not await self.create_webhook(page, capture):
+                return False, None
+
+            token = await self.extract_token(page, capture)
+            if not token:
+                return False, None
+
+            logger.info(f"  ✅ [{email}] Cliente processado com sucesso!")
+            return True, token
+        finally:
+            await page.context.close()
+
+    async def process_one(self, semaphore: asyncio.Semaphore, i: int, total: int, cliente: Dict) -> Dict:
+        """Processa um cliente respeitando o limite do semáforo"""
+        async with semaphore:
+            logger.info(f"\n[{i}/{total}] Processando {cliente.get('Login', '').strip()}...")
+            try:
+                success, token = await self.process_client(cliente)
+            except Exception as e:
+                logger.error(f"  ❌ Erro ao processar cliente: {str(e)}")
+                success, token = False, None
+
+            # Grava antes da pausa: um cancelamento durante o sleep não perde o token
+            result = self.record_result(cliente, success, token)
+
+            # Pausa por slot, equivalente ao WAIT_BETWEEN_CLIENTS do modo síncrono
+            if i < total:
+                await asyncio.sleep(WAIT_BETWEEN_CLIENTS)
+
+            return result
+
+    async def process_all_async(self, clientes: List[Dict]) -> Dict[str, str]:
+        """Fan-out de todos os clientes sobre um único Chromium"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        total = len(clientes)
+        logger.info(f"Processando {total} clientes com até {self.concurrency} sessões simultâneas...")
+
+        async with async_playwright() as playwright:
+            self.async_browser = await playwright.chromium.launch(
+                headless=self.headless,
+                args=['--no-sandbox', '--disable-setuid-sandbox']
+            )
+            try:
+                # gather preserva a ordem do CSV nos resultados
+                results = await asyncio.gather(*(
+                    self.process_one(semaphore, i, total, cliente)
+                    for i, cliente in enumerate(clientes, 1)
+                ))
+            finally:
+                await self.async_browser.close()
+                self.async_browser = None
+
+        tokens = {}
+        for result in results:
+            self.results.append(result)
+            if result['success'] and result['token']:
+                tokens[result['login']] = result['token']
+        return tokens
+
+    def process_all(self, clientes: List[Dict]) -> Dict[str, str]:
+        """Executa o fan-out assíncrono dentro do fluxo síncrono de run()"""
+        return asyncio.run(self.process_all_async(clientes))
+
+
+def main():
+    """Função principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='F360 Token Scraper (asyncio)')
+    parser.add_argument('--headless', action='store_true', help='Executar em modo headless (sem interface gráfica)')
+    parser.add_argument('--csv', type=str, help='Caminho para o arquivo CSV (opcional)')
+    parser.add_argument('--journal', type=str, help='Caminho do journal de checkpoint (opcional)')
+    parser.add_argument('--token-store', type=str, help='Caminho do token store SQLite (opcional)')
+    parser.add_argument('--resume', action='store_true', help='Pular logins que já têm token no token store ou no journal')
+    parser.add_argument('--session-ttl', type=int, default=SESSION_TTL,
+                        help='Validade em segundos das sessões em cache por login (0 desativa)')
+    parser.add_argument('--block-profile', choices=sorted(BLOCK_PROFILES), default=DEFAULT_BLOCK_PROFILE,
+                        help='Perfil de bloqueio de recursos desnecessários')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Máximo de sessões F360 simultâneas no mesmo Chromium (padrão: {DEFAULT_CONCURRENCY})')
+
+    args = parser.parse_args()
+
+    # Atualizar caminho do CSV se fornecido (lido pelos métodos herdados)
+    if args.csv:
+        f360_token_scraper.CSV_PATH = Path(args.csv)
+
+    scraper = AsyncF360TokenScraper(
+        headless=args.headless,
+        concurrency=args.concurrency,
+        journal_path=Path(args.journal) if args.journal else None,
+        resume=args.resume,
+        session_cache=SessionCache(ttl=args.session_ttl),
+        blocker=RequestBlocker(args.block_profile),
+        token_store_path=Path(args.token_store) if args.token_store else None
+    )
+    scraper.run()
+
+
+if __name__ == "__main__":
+    main()
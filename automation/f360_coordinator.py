@@ -0,0 +1,399 @@
+"""
+F360 Coordinator - Distribuição da lista de acessos entre workers por lease
+
+Substitui o fatiamento manual por OFFSET/LIMIT: a lista de clientes é
+carregada uma vez em um lease store e cada worker (processo ou máquina) pede
+o próximo cliente livre. O lease expira depois de `lease_ttl` segundos; se o
+worker morrer no meio, o cliente volta a ficar disponível e outro worker o
+pega. Resultados (token ou erro) ficam no mesmo store, que serve de relatório
+agregado da execução.
+
+Lease stores:
+- LeaseStore:       SQLite local (WAL). Vários processos na mesma máquina
+                    podem abrir o mesmo arquivo diretamente.
+- HttpLeaseClient:  cliente do `serve` abaixo, para workers em outras máquinas
+                    (o SQLite fica só no host do coordenador).
+
+O `serve` entrega as senhas dos clientes no /acquire, então só responde a
+quem envia o segredo compartilhado (variável COORDINATOR_SECRET, a mesma nos
+workers) e, por padrão, escuta apenas em 127.0.0.1. /results e o export
+nunca incluem a senha.
+
+Uso:
+    python automation/f360_coordinator.py seed --db leases.sqlite3 --csv lista.csv
+    COORDINATOR_SECRET=... python automation/f360_coordinator.py serve --db leases.sqlite3 --host 0.0.0.0
+    python automation/f360_coordinator.py status --db leases.sqlite3
+    python automation/f360_coordinator.py export --db leases.sqlite3 --json tokens.json --csv lista.csv
+"""
+
+import hmac
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from f360_csv_loader import ClientRecord
+
+LEASE_TTL = 300  # segundos por cliente (login + webhook + token)
+MAX_ATTEMPTS = 3
+DEFAULT_PORT = 8765
+DEFAULT_HOST = '127.0.0.1'
+SECRET_ENV = 'COORDINATOR_SECRET'
+SECRET_HEADER = 'X-Coordinator-Secret'
+PRIVATE_FIELDS = ('Senha',)  # nunca saem em /results nem no export
+
+# Estados de um cliente no store
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class CoordinatorError(Exception):
+    """Coordenador recusou a requisição ou não respondeu"""
+
+
+class LeaseLost(Exception):
+    """O lease do cliente venceu e ele já pode estar com outro worker"""
+
+
+def default_worker_id() -> str:
+    """Identificador do worker: host + PID (único entre máquinas e processos)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _public(client: Dict) -> Dict:
+    return {key: value for key, value in client.items() if key not in PRIVATE_FIELDS}
+
+
+class LeaseStore:
+    """Fila de clientes com leases em SQLite, compartilhável entre processos"""
+
+    def __init__(self, path: Path, max_attempts: int = MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS leases ('
+            ' login TEXT PRIMARY KEY,'
+            ' position INTEGER NOT NULL,'
+            ' client TEXT NOT NULL,'
+            ' status TEXT NOT NULL,'
+            ' worker TEXT,'
+            ' lease_expires REAL,'
+            ' attempts INTEGER NOT NULL DEFAULT 0,'
+            ' token TEXT,'
+            ' error TEXT,'
+            ' updated_at TEXT NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS leases_status ON leases (status, position)')
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE trava a escrita já na leitura: dois workers nunca
+        # selecionam o mesmo cliente livre
+        self._conn.execute('BEGIN IMMEDIATE')
+
+    def seed(self, clients: Iterable[ClientRecord]) -> int:
+        """Carrega os clientes (logins repetidos/já carregados são ignorados)"""
+        added = 0
+        with self._lock:
+            self._transaction()
+            try:
+                position = self._conn.execute('SELECT COALESCE(MAX(position), -1) + 1 FROM leases').fetchone()[0]
+                now = datetime.now().isoformat()
+                for client in clients:
+                    cursor = self._conn.execute(
+                        'INSERT OR IGNORE INTO leases (login, position, client, status, updated_at) VALUES (?, ?, ?, ?, ?)',
+                        (client.login, position, json.dumps(client.as_dict(), ensure_ascii=False), PENDING, now)
+                    )
+                    if cursor.rowcount:
+                        added += 1
+                        position += 1
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return added
+
+    def acquire(self, worker: str, limit: int = 1, lease_ttl: int = LEASE_TTL) -> List[Dict]:
+        """
+        Reserva até `limit` clientes para o worker, na ordem da lista.
+
+        Clientes com lease vencido (worker morto ou travado) voltam para a fila;
+        quem estourar `max_attempts` é marcado como falho.
+        """
+        now = time.time()
+        with self._lock:
+            self._transaction()
+            try:
+                self._conn.execute(
+                    'UPDATE leases SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ?,'
+                    ' error = COALESCE(error, ?)'
+                    ' WHERE status = ? AND lease_expires < ? AND attempts >= ?',
+                    (FAILED, datetime.now().isoformat(), 'Lease expirado', LEASED, now, self.max_attempts)
+                )
+                rows = self._conn.execute(
+                    'SELECT login, client FROM leases'
+                    ' WHERE status = ? OR (status = ? AND lease_expires < ?)'
+                    ' ORDER BY position LIMIT ?',
+                    (PENDING, LEASED, now, limit)
+                ).fetchall()
+                for row in rows:
+                    self._conn.execute(
+                        'UPDATE leases SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1,'
+                        ' updated_at = ? WHERE login = ?',
+                        (LEASED, worker, now + lease_ttl, datetime.now().isoformat(), row['login'])
+                    )
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [json.loads(row['client']) for row in rows]
+
+    def renew(self, worker: str, login: str, lease_ttl: int = LEASE_TTL) -> bool:
+        """Estende o lease de um cliente ainda em andamento"""
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE leases SET lease_expires = ? WHERE login = ? AND status = ? AND worker = ?',
+                (time.time() + lease_ttl, login, LEASED, worker)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, worker: str, login: str, token: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """
+        Registra o resultado do cliente.
+
+        Só vale se o worker ainda for o dono do lease: um worker atrasado cujo
+        cliente já foi re-entregue não sobrescreve o resultado do novo dono.
+        Em caso de erro o cliente volta para a fila até `max_attempts`.
+        """
+        if token:
+            status, error = DONE, None
+        else:
+            status = None  # decidido pelas tentativas abaixo
+        with self._lock:
+            cursor = self._conn.execute(
+                'UPDATE leases SET'
+                ' status = COALESCE(?, CASE WHEN attempts >= ? THEN ? ELSE ? END),'
+                ' worker = CASE WHEN ? IS NULL THEN NULL ELSE worker END,'
+                ' lease_expires = NULL, token = ?, error = ?, updated_at = ?'
+                ' WHERE login = ? AND status = ? AND worker = ?',
+                (status, self.max_attempts, FAILED, PENDING, status, token, error,
+                 datetime.now().isoformat(), login, LEASED, worker)
+            )
+        return cursor.rowcount == 1
+
+    def status(self) -> Dict[str, int]:
+        """Quantidade de clientes por estado (leases vencidos contam como pendentes)"""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT CASE WHEN status = ? AND lease_expires < ? THEN ? ELSE status END AS state, COUNT(*)'
+                ' FROM leases GROUP BY state',
+                (LEASED, now, PENDING)
+            ).fetchall()
+        counts.update({state: count for state, count in rows})
+        return counts
+
+    def results(self) -> List[Dict]:
+        """Resultado agregado de todos os clientes, na ordem da lista (sem senhas)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT client, status, worker, attempts, token, error, updated_at FROM leases ORDER BY position'
+            ).fetchall()
+        return [
+            {**_public(json.loads(row['client'])), 'status': row['status'], 'worker': row['worker'],
+             'attempts': row['attempts'], 'token': row['token'], 'error': row['error'],
+             'updated_at': row['updated_at']}
+            for row in rows
+        ]
+
+    def tokens(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT login, token FROM leases WHERE status = ?', (DONE,)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class HttpLeaseClient:
+    """Mesma interface do LeaseStore, falando com `f360_coordinator.py serve`"""
+
+    def __init__(self, url: str, secret: Optional[str] = None, timeout: float = 30):
+        self.url = url.rstrip('/')
+        self.secret = secret if secret is not None else os.environ.get(SECRET_ENV, '')
+        self.timeout = timeout
+
+    def _call(self, endpoint: str, payload: Optional[Dict] = None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.url}/{endpoint}", data=data,
+            headers={'Content-Type': 'application/json', SECRET_HEADER: self.secret}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            try:
+                detail = json.loads(e.read().decode('utf-8')).get('error', e.reason)
+            except ValueError:
+                detail = e.reason
+            raise CoordinatorError(f"{endpoint}: coordenador respondeu {e.code} ({detail})") from None
+        except urllib.error.URLError as e:
+            raise CoordinatorError(f"{endpoint}: coordenador {self.url} inacessível ({e.reason})") from None
+
+    def acquire(self, worker: str, limit: int = 1, lease_ttl: int = LEASE_TTL) -> List[Dict]:
+        return self._call('acquire', {'worker': worker, 'limit': limit, 'lease_ttl': lease_ttl})
+
+    def renew(self, worker: str, login: str, lease_ttl: int = LEASE_TTL) -> bool:
+        return self._call('renew', {'worker': worker, 'login': login, 'lease_ttl': lease_ttl})
+
+    def complete(self, worker: str, login: str, token: Optional[str] = None, error: Optional[str] = None) -> bool:
+        return self._call('complete', {'worker': worker, 'login': login, 'token': token, 'error': error})
+
+    def status(self) -> Dict[str, int]:
+        return self._call('status')
+
+    def results(self) -> List[Dict]:
+        return self._call('results')
+
+    def close(self):
+        pass
+
+
+def open_lease_store(target: str):
+    """URL http(s):// -> HttpLeaseClient; qualquer outro valor -> arquivo SQLite local"""
+    if target.startswith(('http://', 'https://')):
+        return HttpLeaseClient(target)
+    return LeaseStore(Path(target))
+
+
+def make_handler(store: LeaseStore, secret: str):
+    """Handler HTTP mínimo (JSON) que expõe o LeaseStore para workers com o segredo"""
+    expected = secret.encode('utf-8')
+
+    class CoordinatorHandler(BaseHTTPRequestHandler):
+        def _authorized(self) -> bool:
+            received = self.headers.get(SECRET_HEADER, '').encode('utf-8')
+            if hmac.compare_digest(received, expected):
+                return True
+            self._reply({'error': 'segredo do coordenador ausente ou inválido'}, 401)
+            return False
+
+        def _reply(self, payload, code: int = 200):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            if self.path == '/status':
+                self._reply(store.status())
+            elif self.path == '/results':
+                self._reply(store.results())
+            else:
+                self._reply({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                args = json.loads(self.rfile.read(length) or b'{}')
+                if self.path == '/acquire':
+                    self._reply(store.acquire(args['worker'], int(args.get('limit', 1)),
+                                              int(args.get('lease_ttl', LEASE_TTL))))
+                elif self.path == '/renew':
+                    self._reply(store.renew(args['worker'], args['login'], int(args.get('lease_ttl', LEASE_TTL))))
+                elif self.path == '/complete':
+                    self._reply(store.complete(args['worker'], args['login'], args.get('token'), args.get('error')))
+                else:
+                    self._reply({'error': 'not found'}, 404)
+            except (KeyError, ValueError) as e:
+                self._reply({'error': f"requisição inválida: {e}"}, 400)
+
+        def log_message(self, format, *args):
+            pass  # sem log por requisição (um acquire/complete por cliente)
+
+    return CoordinatorHandler
+
+
+def serve(store: LeaseStore, secret: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+    if not secret:
+        raise ValueError(f"serve requer um segredo compartilhado ({SECRET_ENV})")
+    server = ThreadingHTTPServer((host, port), make_handler(store, secret))
+    print(f"Coordenador F360 em http://{host}:{port} ({store.path})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    """Linha de comando do coordenador"""
+    import argparse
+
+    from f360_csv_loader import iter_clients
+    from f360_token_store import materialize_csv
+
+    parser = argparse.ArgumentParser(description='F360 Coordinator - leases da lista de acessos')
+    parser.add_argument('command', choices=['seed', 'serve', 'status', 'export'])
+    parser.add_argument('--db', type=str, required=True, help='Arquivo SQLite do lease store')
+    parser.add_argument('--csv', type=str, help='Lista de acessos (seed: origem; export: CSV a materializar)')
+    parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                        help=f'Tentativas por cliente antes de marcar como falho (padrão: {MAX_ATTEMPTS})')
+    parser.add_argument('--host', type=str, default=DEFAULT_HOST,
+                        help=f'Interface do serve (padrão: {DEFAULT_HOST}; 0.0.0.0 para workers em outras máquinas)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Porta do serve (padrão: {DEFAULT_PORT})')
+    parser.add_argument('--json', type=str, help='export: arquivo JSON com o resultado agregado')
+    args = parser.parse_args()
+
+    store = LeaseStore(Path(args.db), max_attempts=args.max_attempts)
+    try:
+        if args.command == 'seed':
+            if not args.csv:
+                parser.error('seed requer --csv')
+            # clientes sem senha não têm como logar: ficam fora da fila
+            added = store.seed(c for c in iter_clients(Path(args.csv)) if c.senha)
+            print(f"{added} clientes adicionados; {store.status()}")
+        elif args.command == 'serve':
+            secret = os.environ.get(SECRET_ENV, '')
+            if not secret:
+                parser.error(f'serve requer o segredo compartilhado em {SECRET_ENV}')
+            serve(store, secret, args.host, args.port)
+        elif args.command == 'status':
+            print(json.dumps(store.status(), indent=2))
+        elif args.command == 'export':
+            if args.json:
+                Path(args.json).write_text(json.dumps(store.results(), ensure_ascii=False, indent=2), encoding='utf-8')
+                print(f"Resultado agregado: {args.json}")
+            if args.csv:
+                materialize_csv(Path(args.csv), store.tokens())
+                print(f"Tokens gravados em {args.csv}")
+            print(json.dumps(store.status(), indent=2))
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
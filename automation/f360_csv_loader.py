@@ -0,0 +1,128 @@
+"""
+F360 CSV Loader - Leitura única e em streaming da lista de acessos
+
+Compartilhado por f360_token_scraper, f360_async_scraper e agent-playwright.
+Em uma única passada pelo arquivo:
+1. Pula o preâmbulo até a linha de cabeçalho (a que tem Login/Email e Senha)
+2. Detecta o delimitador (';', ',' ou tab) a partir do cabeçalho
+3. Normaliza os nomes de coluna para os nomes canônicos
+4. Gera ClientRecord sob demanda, sem materializar o arquivo
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DELIMITERS = ';,\t'
+DEFAULT_DELIMITER = ';'
+
+# Coluna canônica -> aliases (minúsculos, por prioridade). Uma célula igual ao alias
+# vence; sem ela, vale o casamento por "contém" da leitura original do scraper.
+COLUMN_ALIASES = {
+    'Login': ('login', 'e-mail', 'email'),
+    'Senha': ('senha', 'password'),
+    'Razão Social': ('razão social', 'razao social', 'razão', 'razao', 'empresa', 'nome fantasia', 'cliente', 'nome'),
+    'CNPJ': ('cnpj',),
+    'Unidade': ('unidade',),
+    'Grupo': ('grupo',),
+}
+
+# Linhas de rodapé/observação da planilha exportada
+SKIP_PREFIXES = ('Infomações', 'Informações')
+
+
+class ClientRecord(NamedTuple):
+    """Cliente F360 com colunas normalizadas"""
+    login: str
+    senha: str
+    razao_social: str = ''
+    cnpj: str = ''
+    unidade: str = ''
+    grupo: str = ''
+    extra: Optional[Dict[str, str]] = None
+
+    def as_dict(self) -> Dict[str, str]:
+        """Formato de dicionário usado pelo F360TokenScraper (chaves canônicas + extras)"""
+        return {
+            'Login': self.login,
+            'Senha': self.senha,
+            'Razão Social': self.razao_social,
+            'CNPJ': self.cnpj,
+            'Unidade': self.unidade,
+            'Grupo': self.grupo,
+            **(self.extra or {}),
+        }
+
+
+def is_header(line: str) -> bool:
+    """Linha de cabeçalho: tem uma célula inteira de login/email e outra de senha/password"""
+    for delimiter in DELIMITERS:
+        cells = {c.strip().lower() for c in next(csv.reader([line], delimiter=delimiter), [])}
+        if not cells.isdisjoint(COLUMN_ALIASES['Login']) and not cells.isdisjoint(COLUMN_ALIASES['Senha']):
+            return True
+    return False
+
+
+def sniff_delimiter(header_line: str) -> str:
+    try:
+        return csv.Sniffer().sniff(header_line, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return DEFAULT_DELIMITER
+
+
+def _find_column(lowered: List[str], aliases: Tuple[str, ...], taken: Dict[int, str]) -> Optional[int]:
+    # Mesma regra de is_header primeiro (célula inteira), para "Login Gestor;Login" mapear "Login"
+    for matches in (str.__eq__, lambda header, alias: alias in header):
+        for alias in aliases:
+            idx = next((i for i, h in enumerate(lowered) if i not in taken and matches(h, alias)), None)
+            if idx is not None:
+                return idx
+    return None
+
+
+def map_columns(header: List[str]) -> Dict[int, str]:
+    """Índice da coluna -> nome canônico (ou o nome original, para colunas extras)"""
+    lowered = [h.strip().lower() for h in header]
+    mapping: Dict[int, str] = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        idx = _find_column(lowered, aliases, mapping)
+        if idx is not None:
+            mapping[idx] = canonical
+    for i, name in enumerate(header):
+        if i not in mapping and name.strip():
+            mapping[i] = name.strip()
+    return mapping
+
+
+def iter_clients(path: Path, encoding: str = 'utf-8-sig') -> Iterator[ClientRecord]:
+    """Gera os clientes do CSV em uma única passada (linhas sem login são puladas)"""
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        header_line: Optional[str] = None
+        for line in f:
+            if is_header(line):
+                header_line = line
+                break
+        if header_line is None:
+            raise ValueError(f"Cabeçalho do CSV não encontrado em {path}")
+
+        delimiter = sniff_delimiter(header_line)
+        header = next(csv.reader([header_line], delimiter=delimiter))
+        columns = map_columns(header)
+
+        # O reader continua do ponto em que a busca pelo cabeçalho parou
+        for values in csv.reader(f, delimiter=delimiter):
+            if not values or values[0].startswith(SKIP_PREFIXES):
+                continue
+            row = {columns[i]: v.strip() for i, v in enumerate(values) if i in columns}
+            login = row.pop('Login', '')
+            if not login:
+                continue
+            yield ClientRecord(
+                login=login,
+                senha=row.pop('Senha', ''),
+                razao_social=row.pop('Razão Social', ''),
+                cnpj=row.pop('CNPJ', ''),
+                unidade=row.pop('Unidade', ''),
+                grupo=row.pop('Grupo', ''),
+                extra=row,
+            )
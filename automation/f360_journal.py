@@ -0,0 +1,55 @@
+"""
+F360 Journal - Checkpoint append-only das execuções do scraper
+
+Cada resultado de process_client vira uma linha JSON no journal, gravada com
+flush + fsync antes de seguir para o próximo cliente. Se a execução cair no
+meio, os tokens já capturados continuam no disco e o modo --resume pula os
+logins que já têm token no journal ou no token store (f360_token_store).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator
+
+
+class TokenJournal:
+    """Journal JSONL append-only com fsync por registro"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()  # workers do modo paralelo gravam no mesmo arquivo
+
+    def append(self, result: Dict):
+        """Grava um resultado e só retorna depois do fsync"""
+        record = {'ts': datetime.now().isoformat(), **result}
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self) -> Iterator[Dict]:
+        """Lê os registros em ordem, ignorando uma última linha truncada por crash"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def tokens(self) -> Dict[str, str]:
+        """Login -> token de todos os clientes já concluídos com sucesso"""
+        tokens = {}
+        for record in self.records():
+            if record.get('success') and record.get('token') and record.get('login'):
+                tokens[record['login']] = record['token']
+        return tokens
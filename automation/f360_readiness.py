@@ -0,0 +1,148 @@
+"""
+F360 Readiness - Condições de prontidão para o scraper
+
+Substitui os time.sleep fixos do fluxo por esperas em condições concretas
+(elemento no DOM, saída da tela de login, diálogo do token), sempre com
+timeout explícito. Assim o tempo por cliente acompanha a velocidade real
+do F360 em vez de um pior caso estimado.
+
+As funções montam Locators, que são iguais nas APIs sync e async (e a
+TimeoutError é a mesma classe nas duas); as variantes *_async servem o
+f360_async_scraper.
+"""
+
+from typing import List
+
+from playwright.sync_api import Locator, Page, TimeoutError as PlaywrightTimeoutError
+
+# Timeouts em milissegundos
+FIELD_TIMEOUT = 10000  # campos/botões de formulário
+LOGIN_TIMEOUT = 60000  # saída da tela de login (inclui CAPTCHA)
+CAPTCHA_TIMEOUT = 10000  # resolução automática do reCAPTCHA
+PAGE_TIMEOUT = 30000  # página de integrações pronta
+DIALOG_TIMEOUT = 15000  # modal de criação / diálogo do token
+
+# Modal de criação de integração
+MODAL_SELECTORS = [
+    '[role="dialog"]',
+    '[class*="modal"]',
+    'dialog',
+    'select'
+]
+
+# Diálogo "Sua chave de acesso para a API" com o token
+TOKEN_DIALOG_SELECTORS = [
+    '[role="dialog"] input[readonly]',
+    '[class*="modal"] input[readonly]',
+    '[class*="dialog"] input[readonly]',
+    'input[readonly][value*="-"]',
+    '[class*="token"]',
+    '[data-token]'
+]
+
+RECAPTCHA_RESPONSE_SELECTOR = 'textarea[name="g-recaptcha-response"]'
+
+# Mensagem que o F360 exibe na própria tela de login quando as credenciais são recusadas
+LOGIN_ERROR_PATTERN = 'credenciais inválidas'
+
+# Login concluído: campo de senha sumiu ou a mensagem de credenciais recusadas está visível.
+# Procura o texto em nós de texto (como o seletor text= do Playwright), não no innerText
+# da página inteira, para não confundir com "erro"/"falha" em outros textos da tela.
+LOGIN_SETTLED_JS = """(pattern) => {
+    const field = document.querySelector('input[type="password"]');
+    if (!field || field.offsetParent === null) return true;
+    const re = new RegExp(pattern, 'i');
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const el = node.parentElement;
+        if (el && el.offsetParent !== null && re.test(node.textContent)) return true;
+    }
+    return false;
+}"""
+
+# reCAPTCHA resolvido: textarea de resposta ausente ou preenchida
+RECAPTCHA_SOLVED_JS = """(selector) => {
+    const el = document.querySelector(selector);
+    return !el || el.value.length > 0;
+}"""
+
+
+class ReadinessTimeout(Exception):
+    """Condição de prontidão não satisfeita dentro do timeout"""
+
+
+def any_of(page: Page, selectors: List[str]) -> Locator:
+    """
+    Locator do primeiro elemento visível que casa com qualquer um dos seletores.
+
+    Cada seletor é filtrado por visibilidade antes do .or_: sem isso, .first
+    pegaria o primeiro elemento em ordem de DOM (por exemplo um '[class*="modal"]'
+    oculto) e a espera ficaria presa nele mesmo com o diálogo real na tela.
+    """
+    locator = page.locator(f"{selectors[0]} >> visible=true")
+    for selector in selectors[1:]:
+        locator = locator.or_(page.locator(f"{selector} >> visible=true"))
+    return locator.first
+
+
+def wait_for_any(page: Page, selectors: List[str], description: str,
+                 timeout: int = FIELD_TIMEOUT) -> Locator:
+    """Aguarda o primeiro elemento visível da lista e retorna o Locator"""
+    locator = any_of(page, selectors)
+    try:
+        locator.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        raise ReadinessTimeout(f"{description} não apareceu em {timeout}ms")
+    return locator
+
+
+def wait_for_login_exit(page: Page, timeout: int = LOGIN_TIMEOUT) -> bool:
+    """
+    Aguarda o formulário de login sumir ou o F360 recusar as credenciais.
+
+    Retorna True quando o login saiu da tela, False quando a mensagem
+    "Credenciais inválidas" apareceu.
+    """
+    try:
+        page.wait_for_function(LOGIN_SETTLED_JS, arg=LOGIN_ERROR_PATTERN, timeout=timeout)
+    except PlaywrightTimeoutError:
+        raise ReadinessTimeout(f"Tela de login não foi concluída em {timeout}ms")
+    return not page.locator('input[type="password"]').first.is_visible()
+
+
+def wait_for_recaptcha(page: Page, timeout: int = CAPTCHA_TIMEOUT) -> bool:
+    """Aguarda o reCAPTCHA preencher sua resposta; False se não resolver no prazo"""
+    try:
+        page.wait_for_function(RECAPTCHA_SOLVED_JS, arg=RECAPTCHA_RESPONSE_SELECTOR, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+async def wait_for_any_async(page, selectors: List[str], description: str,
+                             timeout: int = FIELD_TIMEOUT):
+    """Versão async de wait_for_any"""
+    locator = any_of(page, selectors)
+    try:
+        await locator.wait_for(state="visible", timeout=timeout)
+    except PlaywrightTimeoutError:
+        raise ReadinessTimeout(f"{description} não apareceu em {timeout}ms")
+    return locator
+
+
+async def wait_for_login_exit_async(page, timeout: int = LOGIN_TIMEOUT) -> bool:
+    """Versão async de wait_for_login_exit"""
+    try:
+        await page.wait_for_function(LOGIN_SETTLED_JS, arg=LOGIN_ERROR_PATTERN, timeout=timeout)
+    except PlaywrightTimeoutError:
+        raise ReadinessTimeout(f"Tela de login não foi concluída em {timeout}ms")
+    return not await page.locator('input[type="password"]').first.is_visible()
+
+
+async def wait_for_recaptcha_async(page, timeout: int = CAPTCHA_TIMEOUT) -> bool:
+    """Versão async de wait_for_recaptcha"""
+    try:
+        await page.wait_for_function(RECAPTCHA_SOLVED_JS, arg=RECAPTCHA_RESPONSE_SELECTOR, timeout=timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
@@ -0,0 +1,130 @@
+"""
+F360 Request Blocking - Perfis de bloqueio de requisições por contexto
+
+O fluxo só precisa dos formulários e do diálogo do token; imagens, fontes,
+mídia e scripts de analytics só aumentam a latência de cada página. Um
+perfil instala um context.route que aborta esses recursos e contabiliza as
+requisições bloqueadas (e os bytes economizados, estimados por tipo) para o
+relatório da execução.
+
+Perfis:
+- off:        nada é bloqueado
+- safe:       imagens, mídia, fontes e hosts de analytics/anúncios (padrão)
+- aggressive: safe + folhas de estilo (pode afetar checagens de visibilidade)
+"""
+
+import threading
+from collections import Counter
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+BLOCK_PROFILES: Dict[str, frozenset] = {
+    'off': frozenset(),
+    'safe': frozenset({'image', 'media', 'font'}),
+    'aggressive': frozenset({'image', 'media', 'font', 'stylesheet'}),
+}
+DEFAULT_BLOCK_PROFILE = 'safe'
+
+# Hosts de terceiros sem utilidade para o fluxo (reCAPTCHA/gstatic ficam liberados)
+BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'clarity.ms',
+    'hubspot.com',
+    'intercom.io',
+    'zdassets.com',
+    'tawk.to',
+)
+
+# Tamanho típico por tipo de recurso, usado para estimar os bytes economizados
+ESTIMATED_BYTES = {
+    'image': 30_000,
+    'media': 250_000,
+    'font': 40_000,
+    'stylesheet': 25_000,
+    'script': 60_000,
+}
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+
+class RequestBlocker:
+    """Bloqueia requisições desnecessárias e acumula estatísticas da execução"""
+
+    def __init__(self, profile: str = DEFAULT_BLOCK_PROFILE):
+        if profile not in BLOCK_PROFILES:
+            raise ValueError(f"Perfil de bloqueio desconhecido: {profile}")
+        self.profile = profile
+        self.resource_types = BLOCK_PROFILES[profile]
+        self.blocked_by_reason: Counter = Counter()
+        self.bytes_saved = 0
+        self.requests_allowed = 0
+        self._lock = threading.Lock()  # compartilhado pelos workers do modo paralelo
+
+    @property
+    def enabled(self) -> bool:
+        return self.profile != 'off'
+
+    @property
+    def requests_blocked(self) -> int:
+        return sum(self.blocked_by_reason.values())
+
+    def block_reason(self, request) -> Optional[str]:
+        """Motivo do bloqueio (tipo de recurso ou host), ou None para liberar"""
+        if request.resource_type in self.resource_types:
+            return request.resource_type
+        host = urlparse(request.url).hostname or ''
+        for blocked in BLOCKED_HOSTS:
+            if host == blocked or host.endswith('.' + blocked):
+                return blocked
+        return None
+
+    def _account(self, request, reason: Optional[str]):
+        with self._lock:
+            if reason is None:
+                self.requests_allowed += 1
+                return
+            self.blocked_by_reason[reason] += 1
+            self.bytes_saved += ESTIMATED_BYTES.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+
+    def _handle(self, route):
+        reason = self.block_reason(route.request)
+        self._account(route.request, reason)
+        if reason:
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_async(self, route):
+        reason = self.block_reason(route.request)
+        self._account(route.request, reason)
+        if reason:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, context):
+        """Instala o bloqueio em um BrowserContext (API sync)"""
+        if self.enabled:
+            context.route('**/*', self._handle)
+
+    async def install_async(self, context):
+        """Instala o bloqueio em um BrowserContext (API async)"""
+        if self.enabled:
+            await context.route('**/*', self._handle_async)
+
+    def summary(self) -> str:
+        """Resumo da economia para log/relatório"""
+        if not self.enabled:
+            return "Bloqueio de requisições desativado"
+        details = ', '.join(f"{reason}: {count}" for reason, count in self.blocked_by_reason.most_common())
+        return (
+            f"Perfil '{self.profile}': {self.requests_blocked} requisições bloqueadas "
+            f"de {self.requests_blocked + self.requests_allowed}, "
+            f"~{self.bytes_saved / 1_000_000:.1f} MB economizados (estimado)"
+            + (f" [{details}]" if details else "")
+        )
@@ -0,0 +1,70 @@
+"""
+F360 Session Cache - Reaproveitamento de sessões autenticadas por login
+
+Guarda o storage_state do Playwright (cookies + localStorage) de cada conta
+F360 depois de um login bem-sucedido. Enquanto o estado estiver dentro do TTL,
+o scraper abre o contexto já autenticado e pula o passo de login; se o F360
+redirecionar para a tela de login, a entrada é invalidada e o login completo
+é feito normalmente.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+SESSION_DIR = Path(__file__).parent / ".f360_sessions"
+SESSION_TTL = 30 * 60  # segundos
+
+
+class SessionCache:
+    """Cache em disco de storage_state por login, com TTL"""
+
+    def __init__(self, directory: Path = SESSION_DIR, ttl: int = SESSION_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _path(self, login: str) -> Path:
+        # Hash do login: o nome do arquivo não expõe o email do cliente
+        digest = hashlib.sha256(login.strip().lower().encode('utf-8')).hexdigest()[:32]
+        return self.directory / f"{digest}.json"
+
+    def get(self, login: str) -> Optional[Dict]:
+        """storage_state do login, ou None se ausente/expirado/ilegível"""
+        if not self.enabled:
+            return None
+        path = self._path(login)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - entry.get('saved_at', 0) > self.ttl:
+            self.invalidate(login)
+            return None
+        return entry.get('storage_state')
+
+    def save(self, login: str, storage_state: Dict):
+        """Grava o estado atomicamente (arquivo temporário + rename), legível só pelo dono"""
+        if not self.enabled:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(login)
+        tmp_path = path.with_suffix('.tmp')
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': time.time(), 'storage_state': storage_state}, f)
+        os.replace(tmp_path, path)
+
+    def invalidate(self, login: str):
+        """Remove a sessão do login (ex.: F360 redirecionou para a tela de login)"""
+        try:
+            self._path(login).unlink()
+        except FileNotFoundError:
+            pass
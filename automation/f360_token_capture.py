@@ -0,0 +1,106 @@
+"""
+F360 Token Capture - Captura do token direto da resposta de rede
+
+Em vez de varrer o DOM atrás do token (dezenas de round-trips CDP por
+cliente), registra um listener de "response" na página e guarda as respostas
+JSON da criação do webhook. O scraper chama `arm()` logo antes da ação que
+cria o webhook; só as respostas POST/PUT de /Webservice ou /integracao que
+chegam depois disso contam, e delas só valores sob chaves explícitas de
+token. Ids de integração/empresa em outras respostas ou campos nunca são
+tomados como token; sem token na resposta, a varredura do DOM é o fallback.
+"""
+
+import re
+from typing import Any, List, Optional
+
+# Padrões de token: UUID (8-4-4-4-12 hexadecimais) ou hexadecimal longo sem hífens
+UUID_RE = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', re.IGNORECASE)
+HEX_TOKEN_RE = re.compile(r'[0-9a-f]{32,}', re.IGNORECASE)
+
+# Requisições de criação/gravação da integração
+WEBHOOK_RESPONSE_RE = re.compile(r'/(webservice|integracao)', re.IGNORECASE)
+WEBHOOK_METHODS = ('POST', 'PUT')
+
+# Chaves do JSON que carregam o token (comparadas em minúsculas, sem "_")
+TOKEN_KEYS = ('token', 'chave', 'chaveacesso', 'apikey', 'accesstoken')
+
+
+def is_webhook_response(response) -> bool:
+    """Resposta JSON de uma requisição de criação de integração"""
+    return (
+        response.request.method in WEBHOOK_METHODS
+        and WEBHOOK_RESPONSE_RE.search(response.url) is not None
+        and 'json' in response.headers.get('content-type', '')
+    )
+
+
+def match_token(value: Any) -> Optional[str]:
+    """Token contido em um valor string (UUID primeiro, depois hexadecimal longo)"""
+    if not isinstance(value, str):
+        return None
+    match = UUID_RE.search(value) or HEX_TOKEN_RE.search(value)
+    return match.group(0) if match else None
+
+
+def find_token(payload: Any) -> Optional[str]:
+    """Procura o token no JSON da resposta, só sob as chaves de TOKEN_KEYS"""
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if isinstance(value, (dict, list)):
+                    stack.append(value)
+                elif str(key).replace('_', '').lower() in TOKEN_KEYS:
+                    token = match_token(value)
+                    if token:
+                        return token
+        elif isinstance(node, list):
+            stack.extend(node)
+    return None
+
+
+class ResponseTokenCapture:
+    """Listener de respostas da página que guarda as da criação do webhook"""
+
+    def __init__(self, page):
+        self.responses: List[Any] = []
+        self.armed = False
+        page.on('response', self._on_response)
+
+    def arm(self):
+        """Passa a guardar respostas: chamar logo antes da ação que cria o webhook"""
+        self.responses.clear()
+        self.armed = True
+
+    def reset(self):
+        """Descarta respostas e desarma (página reaproveitada para outro cliente)"""
+        self.responses.clear()
+        self.armed = False
+
+    def _on_response(self, response):
+        # Só filtra no handler; o corpo é lido depois, fora do evento
+        if self.armed and is_webhook_response(response):
+            self.responses.append(response)
+
+    def token(self) -> Optional[str]:
+        """Token da resposta mais recente (API sync)"""
+        for response in reversed(self.responses):
+            try:
+                token = find_token(response.json())
+            except Exception:
+                continue
+            if token:
+                return token
+        return None
+
+    async def token_async(self) -> Optional[str]:
+        """Token da resposta mais recente (API async)"""
+        for response in reversed(self.responses):
+            try:
+                token = find_token(await response.json())
+            except Exception:
+                continue
+            if token:
+                return token
+        return None
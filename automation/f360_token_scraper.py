@@ -10,17 +10,38 @@ Este script:
 5. Atualiza o CSV com a coluna de token
 """
 
-import csv
 import os
+import queue
 import sys
+import threading
 import time
 import logging
+from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
 
+from f360_csv_loader import iter_clients
+from f360_journal import TokenJournal
+from f360_request_blocking import BLOCK_PROFILES, DEFAULT_BLOCK_PROFILE, RequestBlocker
+from f360_session_cache import SESSION_TTL, SessionCache
+from f360_token_capture import HEX_TOKEN_RE, UUID_RE, ResponseTokenCapture
+from f360_token_store import TokenStore, materialize_csv, materialize_xlsx
+from f360_readiness import (
+    CAPTCHA_TIMEOUT,
+    DIALOG_TIMEOUT,
+    MODAL_SELECTORS,
+    PAGE_TIMEOUT,
+    TOKEN_DIALOG_SELECTORS,
+    ReadinessTimeout,
+    any_of,
+    wait_for_any,
+    wait_for_login_exit,
+    wait_for_recaptcha,
+)
+
 # Configuração de logging
 logging.basicConfig(
     level=logging.INFO,
@@ -38,21 +59,305 @@ CSV_PATH = Path(__file__).parent.parent / "docs" / "F360 - Lista de acessos.csv"
 CSV_BACKUP_PATH = Path(__file__).parent.parent / "docs" / f"F360 - Lista de acessos_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 LOG_FILE = Path(__file__).parent / "f360_token_scraper.log"
 RESULTS_FILE = Path(__file__).parent / f"f360_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+JOURNAL_FILE = Path(__file__).parent / "f360_journal.jsonl"
+TOKEN_STORE_FILE = Path(__file__).parent / "f360_tokens.sqlite3"
 
 # Timeouts em milissegundos
 TIMEOUT = 30000  # 30 segundos
 WAIT_BETWEEN_CLIENTS = 3  # segundos
+DEFAULT_WORKERS = 1  # 1 = modo sequencial (um navegador, uma página)
 
+# Opções de cada contexto de navegador (um contexto isolado por cliente)
+CONTEXT_OPTIONS = {
+    'viewport': {'width': 1280, 'height': 800},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
 
-class F360TokenScraper:
-    """Classe principal para automação de tokens F360"""
+# Seletores usados em cada passo (compartilhados com f360_async_scraper)
+EMAIL_SELECTORS = [
+    'input[type="email"]',
+    'input[name="email"]',
+    'input[id*="email"]',
+    'input[placeholder*="e-mail" i]',
+    'input[placeholder*="email" i]',
+    'input.email',
+    'input#email'
+]
+
+SENHA_SELECTORS = [
+    'input[type="password"]',
+    'input[name="password"]',
+    'input[name="senha"]',
+    'input[id*="password"]',
+    'input[id*="senha"]',
+    'input.password'
+]
+
+LOGIN_BUTTON_SELECTORS = [
+    'button:has-text("login")',
+    'button:has-text("Login")',
+    'button[type="submit"]',
+    'button:has-text("Entrar")',
+    'button:has-text("Acessar")',
+    'button.login',
+    'button#login',
+    'input[type="submit"]',
+    'a:has-text("login")',
+    'a:has-text("Login")'
+]
+
+CADASTRO_SELECTORS = [
+    'a:has-text("Cadastro")',
+    'button:has-text("Cadastro")',
+    'text=/cadastro/i',
+    '[aria-label*="Cadastro"]',
+    'nav a:has-text("Cadastro")',
+    '[href*="cadastro"]'
+]
+
+INTEGRACAO_SELECTORS = [
+    'a:has-text("Integração")',
+    'a:has-text("Integrações")',
+    'text=/integra[çc][ãa]o/i',
+    '[href*="integracao"]',
+    '[href*="Webservice"]',
+    'button:has-text("Integração")'
+]
+
+CRIAR_SELECTORS = [
+    'button:has-text("CRIAR")',
+    'button:has-text("Criar")',
+    'a:has-text("CRIAR")',
+    'a:has-text("Criar")',
+    'button[class*="criar" i]',
+    'button[class*="create" i]',
+    '[aria-label*="criar" i]'
+]
+
+WEBHOOK_SELECTORS = [
+    'select option:has-text("Webhook API Pública 360")',
+    'select option:has-text("webhook API pública 360")',
+    'select option:has-text("API Pública 360")',
+    'text=/webhook.*api.*pública.*360/i',
+    'text=/api.*pública.*360/i'
+]
+
+RECAPTCHA_SELECTORS = [
+    'iframe[src*="recaptcha"]',
+    'iframe[title*="reCAPTCHA"]',
+    '.g-recaptcha',
+    '#recaptcha'
+]
+
+TOKEN_SELECTORS = [
+    'input[readonly][value*="-"]',
+    'input[readonly]',
+    'code',
+    'pre',
+    '[class*="token"]',
+    '[id*="token"]',
+    '[data-token]',
+    'span[class*="token"]',
+    'div[class*="token"]'
+]
+
+
+class F360ScraperBase(ABC):
+    """
+    Partes do scraper que não dependem da API do Playwright: leitura e
+    materialização do CSV, journal, token store, relatório e o fluxo de run().
     
-    def __init__(self, headless: bool = False):
+    F360TokenScraper (sync) e AsyncF360TokenScraper (asyncio) estendem esta
+    classe e implementam process_all(clientes) -> login -> token.
+    """
+    
+    def __init__(self, headless: bool = False,
+                 journal_path: Optional[Path] = None, resume: bool = False,
+                 session_cache: Optional[SessionCache] = None,
+                 blocker: Optional[RequestBlocker] = None,
+                 token_store_path: Optional[Path] = None,
+                 token_store: Optional[TokenStore] = None):
         self.headless = headless
+        self.journal = TokenJournal(journal_path or JOURNAL_FILE)
+        self.resume = resume
+        # aberto já aqui: os workers do modo paralelo recebem este mesmo store
+        self.token_store = token_store or TokenStore(token_store_path or TOKEN_STORE_FILE)
+        self.session_cache = session_cache or SessionCache()
+        self.blocker = blocker or RequestBlocker()
+        self.results: List[Dict] = []
+        
+    def read_csv(self) -> List[Dict]:
+        """Lê o arquivo CSV (uma única passada, via f360_csv_loader) e retorna lista de clientes"""
+        try:
+            clientes = [cliente.as_dict() for cliente in iter_clients(CSV_PATH)]
+            logger.info(f"Total de clientes encontrados: {len(clientes)}")
+            return clientes
+            
+        except Exception as e:
+            logger.error(f"Erro ao ler CSV: {str(e)}")
+            import traceback
+            logger.error(traceback.format_exc())
+            return []
+    
+    def update_csv(self):
+        """Materializa o CSV com os tokens do store (temporário + os.replace, nunca pela metade)"""
+        try:
+            materialize_csv(CSV_PATH, self.token_store.tokens())
+            logger.info(f"CSV atualizado com sucesso!")
+            
+        except Exception as e:
+            logger.error(f"Erro ao atualizar CSV: {str(e)}")
+            import traceback
+            logger.error(traceback.format_exc())
+            raise
+    
+    def export_xlsx(self, dest: Path):
+        """Exporta a lista de acessos com os tokens do store para XLSX"""
+        materialize_xlsx(CSV_PATH, self.token_store.tokens(), dest)
+        logger.info(f"XLSX exportado: {dest}")
+    
+    def save_results(self):
+        """Salva relatório de resultados"""
+        try:
+            with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+                f.write("="*60 + "\n")
+                f.write("RELATÓRIO DE PROCESSAMENTO F360 TOKENS\n")
+                f.write("="*60 + "\n\n")
+                f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                
+                sucessos = sum(1 for r in self.results if r['success'])
+                falhas = len(self.results) - sucessos
+                
+                f.write(f"Total processado: {len(self.results)}\n")
+                f.write(f"Sucessos: {sucessos}\n")
+                f.write(f"Falhas: {falhas}\n")
+                f.write(f"Requisições: {self.blocker.summary()}\n\n")
+                
+                f.write("="*60 + "\n")
+                f.write("DETALHES POR CLIENTE\n")
+                f.write("="*60 + "\n\n")
+                
+                for result in self.results:
+                    status = "✅ SUCESSO" if result['success'] else "❌ FALHA"
+                    f.write(f"{status} - {result['razao_social']}\n")
+                    f.write(f"  CNPJ: {result['cnpj']}\n")
+                    f.write(f"  Login: {result['login']}\n")
+                    if result['success']:
+                        f.write(f"  Token: {result['token']}\n")
+                    else:
+                        f.write(f"  Erro: {result.get('error', 'Desconhecido')}\n")
+                    f.write("\n")
+            
+            logger.info(f"Relatório salvo em: {RESULTS_FILE}")
+            
+        except Exception as e:
+            logger.error(f"Erro ao salvar resultados: {str(e)}")
+    
+    def record_result(self, cliente: Dict, success: bool, token: Optional[str]) -> Dict:
+        """Monta o registro de resultado de um cliente e grava no journal e no token store"""
+        result = {
+            'success': success,
+            'login': cliente.get('Login', '').strip(),
+            'razao_social': cliente.get('Razão Social', '').strip(),
+            'cnpj': cliente.get('CNPJ', '').strip(),
+            'token': token if success else None,
+            'error': None if success else 'Falha no processamento'
+        }
+        self.journal.append(result)
+        if result['token']:
+            self.token_store.put(result['login'], result['token'])
+        return result
+    
+    def resume_tokens(self) -> Dict[str, str]:
+        """
+        Tokens já capturados: store + journal.
+        
+        Tokens que só estão no journal (execuções anteriores ao token store, ou
+        um crash entre o append no journal e o put no store) são copiados para
+        o store, para também entrarem no CSV materializado.
+        """
+        tokens = self.token_store.tokens()
+        for login, token in self.journal.tokens().items():
+            if login not in tokens:
+                self.token_store.put(login, token)
+                tokens[login] = token
+        return tokens
+    
+    @abstractmethod
+    def process_all(self, clientes: List[Dict]) -> Dict[str, str]:
+        """Processa os clientes, grava cada resultado com record_result e retorna login -> token"""
+    
+    def run(self):
+        """Executa o processo completo"""
+        logger.info("="*60)
+        logger.info("F360 TOKEN SCRAPER - INICIANDO")
+        logger.info("="*60)
+        
+        # Ler clientes do CSV
+        clientes = self.read_csv()
+        if not clientes:
+            logger.error("Nenhum cliente encontrado no CSV!")
+            return
+        
+        # Criar backup do CSV
+        try:
+            import shutil
+            shutil.copy2(CSV_PATH, CSV_BACKUP_PATH)
+            logger.info(f"Backup criado: {CSV_BACKUP_PATH}")
+        except Exception as e:
+            logger.warning(f"Não foi possível criar backup: {str(e)}")
+        
+        # Retomar: pular logins que já têm token no store ou no journal
+        pendentes = clientes
+        if self.resume:
+            tokens_salvos = self.resume_tokens()
+            pendentes = [c for c in clientes if c.get('Login', '').strip() not in tokens_salvos]
+            logger.info(f"Retomando do token store {self.token_store.path} e do journal {self.journal.path}: "
+                        f"{len(clientes) - len(pendentes)} clientes já com token, {len(pendentes)} pendentes")
+        
+        # Processar clientes (cada token é gravado no store assim que capturado)
+        if pendentes:
+            self.process_all(pendentes)
+        
+        # Materializar o CSV com os tokens do store
+        total_tokens = len(self.token_store.tokens())
+        if total_tokens:
+            logger.info(f"\nAtualizando CSV com {total_tokens} tokens...")
+            self.update_csv()
+        
+        # Salvar relatório
+        self.save_results()
+        
+        # Resumo final
+        logger.info("\n" + "="*60)
+        logger.info("PROCESSAMENTO CONCLUÍDO")
+        logger.info("="*60)
+        sucessos = sum(1 for r in self.results if r['success'])
+        falhas = len(self.results) - sucessos
+        logger.info(f"Total: {len(self.results)}")
+        logger.info(f"Sucessos: {sucessos}")
+        logger.info(f"Falhas: {falhas}")
+        logger.info(f"Requisições: {self.blocker.summary()}")
+        logger.info(f"Relatório salvo em: {RESULTS_FILE}")
+
+
+class F360TokenScraper(F360ScraperBase):
+    """Classe principal para automação de tokens F360"""
+    
+    def __init__(self, headless: bool = False, workers: int = DEFAULT_WORKERS,
+                 journal_path: Optional[Path] = None, resume: bool = False,
+                 session_cache: Optional[SessionCache] = None,
+                 blocker: Optional[RequestBlocker] = None,
+                 token_store_path: Optional[Path] = None,
+                 token_store: Optional[TokenStore] = None):
+        super().__init__(headless=headless, journal_path=journal_path, resume=resume,
+                         session_cache=session_cache, blocker=blocker,
+                         token_store_path=token_store_path, token_store=token_store)
+        self.workers = max(1, workers)
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.results: List[Dict] = []
+        self.capture: Optional[ResponseTokenCapture] = None
         
     def setup_browser(self, playwright):
         """Inicializa o navegador"""
@@ -61,11 +366,34 @@ class F360TokenScraper:
             headless=self.headless,
             args=['--no-sandbox', '--disable-setuid-sandbox']
         )
-        self.context = self.browser.new_context(
-            viewport={'width': 1280, 'height': 800},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        )
+        self.open_context()
+        
+    def open_context(self, storage_state: Optional[Dict] = None):
+        """Abre um contexto limpo (ou autenticado via storage_state), fechando o anterior"""
+        if self.context:
+            self.context.close()
+        self.context = self.browser.new_context(storage_state=storage_state, **CONTEXT_OPTIONS)
+        self.blocker.install(self.context)
         self.page = self.context.new_page()
+        self.capture = ResponseTokenCapture(self.page)
+        
+    def is_login_page(self) -> bool:
+        """Detecta se o F360 redirecionou para a tela de login"""
+        return 'login' in self.page.url.lower() or any_of(self.page, SENHA_SELECTORS).is_visible()
+        
+    def restore_session(self) -> bool:
+        """
+        Abre /Webservice com a sessão em cache e verifica se continua autenticada.
+        
+        Retorna True quando a página de integrações carregou sem redirecionar para o login.
+        """
+        try:
+            self.page.goto(f"{F360_URL}/Webservice", wait_until="domcontentloaded", timeout=TIMEOUT)
+            wait_for_any(self.page, CRIAR_SELECTORS + SENHA_SELECTORS, "Página autenticada", timeout=PAGE_TIMEOUT)
+            return not self.is_login_page()
+        except Exception as e:
+            logger.info(f"  → Sessão em cache não pôde ser reaproveitada: {str(e)}")
+            return False
         
     def teardown_browser(self):
         """Fecha o navegador"""
@@ -82,137 +410,50 @@ class F360TokenScraper:
         """
         try:
             logger.info(f"  → Acessando página de login...")
-            self.page.goto(F360_URL, wait_until="networkidle", timeout=TIMEOUT)
-            
-            # Aguardar campos de login aparecerem
-            logger.info(f"  → Aguardando campos de login...")
-            time.sleep(3)  # Aguardar página carregar completamente
-            
-            # Tentar encontrar campo de email com múltiplos seletores
-            logger.info(f"  → Procurando campo de email...")
-            email_selectors = [
-                'input[type="email"]',
-                'input[name="email"]',
-                'input[id*="email"]',
-                'input[placeholder*="e-mail" i]',
-                'input[placeholder*="email" i]',
-                'input.email',
-                'input#email'
-            ]
-            
-            email_input = None
-            for selector in email_selectors:
-                try:
-                    email_input = self.page.wait_for_selector(selector, timeout=5000)
-                    if email_input:
-                        logger.info(f"  → Campo de email encontrado: {selector}")
-                        break
-                except:
-                    continue
+            self.page.goto(F360_URL, wait_until="domcontentloaded", timeout=TIMEOUT)
             
-            if not email_input:
-                logger.error(f"  ❌ Campo de email não encontrado!")
-                return False
+            # Aguardar o primeiro campo de email visível (seletores em paralelo)
+            logger.info(f"  → Aguardando campo de email...")
+            email_input = wait_for_any(self.page, EMAIL_SELECTORS, "Campo de email")
             
             # Preencher email
             logger.info(f"  → Preenchendo email...")
             email_input.fill(email)
-            time.sleep(1)
             
             # Preencher senha
-            logger.info(f"  → Procurando campo de senha...")
-            senha_selectors = [
-                'input[type="password"]',
-                'input[name="password"]',
-                'input[name="senha"]',
-                'input[id*="password"]',
-                'input[id*="senha"]',
-                'input.password'
-            ]
-            
-            senha_input = None
-            for selector in senha_selectors:
-                try:
-                    senha_input = self.page.wait_for_selector(selector, timeout=5000)
-                    if senha_input:
-                        logger.info(f"  → Campo de senha encontrado: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not senha_input:
-                logger.error(f"  ❌ Campo de senha não encontrado!")
-                return False
+            logger.info(f"  → Aguardando campo de senha...")
+            senha_input = wait_for_any(self.page, SENHA_SELECTORS, "Campo de senha")
             
             logger.info(f"  → Preenchendo senha...")
             senha_input.fill(senha)
-            time.sleep(1)
-            
-            # Verificar se há reCAPTCHA
-            logger.info(f"  → Verificando reCAPTCHA...")
-            time.sleep(2)
             
             # Verificar se há iframe do reCAPTCHA ou elemento do reCAPTCHA
-            recaptcha_exists = (
-                self.page.query_selector('iframe[src*="recaptcha"]') or
-                self.page.query_selector('iframe[title*="reCAPTCHA"]') or
-                self.page.query_selector('.g-recaptcha') or
-                self.page.query_selector('#recaptcha')
+            logger.info(f"  → Verificando reCAPTCHA...")
+            recaptcha_exists = any(
+                self.page.query_selector(selector) for selector in RECAPTCHA_SELECTORS
             )
             
             if recaptcha_exists:
-                logger.warning(f"  ⚠️  reCAPTCHA detectado - aguardando 5 segundos...")
-                time.sleep(5)  # Aguardar CAPTCHA carregar/resolver automaticamente
+                logger.warning(f"  ⚠️  reCAPTCHA detectado - aguardando resolução (até {CAPTCHA_TIMEOUT}ms)...")
+                if not wait_for_recaptcha(self.page):
+                    logger.warning(f"  ⚠️  reCAPTCHA não resolvido no prazo - tentando login mesmo assim")
             
             # Clicar no botão de login
             logger.info(f"  → Procurando botão de login...")
-            
-            # Múltiplos seletores para o botão de login
-            login_button_selectors = [
-                'button:has-text("login")',
-                'button:has-text("Login")',
-                'button[type="submit"]',
-                'button:has-text("Entrar")',
-                'button:has-text("Acessar")',
-                'button.login',
-                'button#login',
-                'input[type="submit"]',
-                'a:has-text("login")',
-                'a:has-text("Login")'
-            ]
-            
-            login_button = None
-            for selector in login_button_selectors:
-                try:
-                    login_button = self.page.wait_for_selector(selector, timeout=3000)
-                    if login_button:
-                        logger.info(f"  → Botão de login encontrado: {selector}")
-                        break
-                except:
-                    continue
-            
-            if not login_button:
+            try:
+                login_button = wait_for_any(self.page, LOGIN_BUTTON_SELECTORS, "Botão de login", timeout=3000)
+                logger.info(f"  → Clicando no botão de login...")
+                login_button.click()
+            except ReadinessTimeout:
                 logger.error(f"  ❌ Botão de login não encontrado!")
                 logger.info(f"  → Tentando pressionar ENTER no campo de senha...")
                 # Alternativa: pressionar Enter no campo de senha
                 self.page.keyboard.press('Enter')
-            else:
-                logger.info(f"  → Clicando no botão de login...")
-                login_button.click()
-            
-            time.sleep(2)
-            
-            # Aguardar navegação após login (timeout maior por causa do CAPTCHA)
-            self.page.wait_for_load_state("networkidle", timeout=60000)  # 60 segundos
             
-            # Verificar se login foi bem-sucedido (verificar se não está mais na página de login)
-            current_url = self.page.url
-            if "login" in current_url.lower():
-                # Verificar se há mensagem de erro
-                error_msg = self.page.query_selector('text=/credenciais inválidas|erro|falha/i')
-                if error_msg:
-                    logger.error(f"  ❌ Login falhou - credenciais inválidas")
-                    return False
+            # Aguardar o formulário sumir ou o F360 exibir erro (timeout maior por causa do CAPTCHA)
+            if not wait_for_login_exit(self.page):
+                logger.error(f"  ❌ Login falhou - credenciais inválidas")
+                return False
             
             logger.info(f"  ✅ Login realizado com sucesso")
             return True
@@ -224,86 +465,39 @@ class F360TokenScraper:
     def navigate_to_integrations(self) -> bool:
         """
         Passo 2 e 3: Navegar até Menu Cadastro > Integrações
+        
+        A página é considerada pronta quando o botão CRIAR fica visível.
         """
         try:
-            logger.info(f"  → Aguardando dashboard carregar...")
-            time.sleep(3)
-            
-            # Primeiro, tentar ir direto para a URL de integrações
-            logger.info(f"  → Tentando acessar diretamente /Webservice...")
-            try:
-                self.page.goto(f"{F360_URL}/Webservice", wait_until="networkidle", timeout=TIMEOUT)
-                logger.info(f"  ✅ Acessou /Webservice diretamente")
-                return True
-            except:
-                logger.info(f"  → URL /Webservice não funcionou, tentando /integracao...")
-            
-            # Tentar /integracao
-            try:
-                self.page.goto(f"{F360_URL}/integracao", wait_until="networkidle", timeout=TIMEOUT)
-                logger.info(f"  ✅ Acessou /integracao diretamente")
-                return True
-            except:
-                logger.info(f"  → URL /integracao não funcionou, tentando via menu...")
+            # Primeiro, tentar ir direto para as URLs de integrações
+            for path in ("/Webservice", "/integracao"):
+                logger.info(f"  → Tentando acessar diretamente {path}...")
+                try:
+                    self.page.goto(f"{F360_URL}{path}", wait_until="domcontentloaded", timeout=TIMEOUT)
+                    wait_for_any(self.page, CRIAR_SELECTORS, "Botão CRIAR", timeout=PAGE_TIMEOUT)
+                    logger.info(f"  ✅ Acessou {path} diretamente")
+                    return True
+                except Exception:
+                    logger.info(f"  → URL {path} não funcionou...")
             
             # Se URLs diretas não funcionarem, tentar via menu
             logger.info(f"  → Procurando menu Cadastro...")
-            
-            cadastro_selectors = [
-                'a:has-text("Cadastro")',
-                'button:has-text("Cadastro")',
-                'text=/cadastro/i',
-                '[aria-label*="Cadastro"]',
-                'nav a:has-text("Cadastro")',
-                '[href*="cadastro"]'
-            ]
-            
-            cadastro_element = None
-            for selector in cadastro_selectors:
-                try:
-                    cadastro_element = self.page.wait_for_selector(selector, timeout=3000)
-                    if cadastro_element:
-                        logger.info(f"  → Menu Cadastro encontrado: {selector}")
-                        cadastro_element.click()
-                        time.sleep(2)
-                        break
-                except:
-                    continue
-            
-            if not cadastro_element:
+            try:
+                wait_for_any(self.page, CADASTRO_SELECTORS, "Menu Cadastro").click()
+            except ReadinessTimeout:
                 logger.error(f"  ❌ Menu Cadastro não encontrado")
                 return False
             
             # Procurar Integrações no submenu
             logger.info(f"  → Procurando Integrações no submenu...")
-            
-            integracao_selectors = [
-                'a:has-text("Integração")',
-                'a:has-text("Integrações")',
-                'text=/integra[çc][ãa]o/i',
-                '[href*="integracao"]',
-                '[href*="Webservice"]',
-                'button:has-text("Integração")'
-            ]
-            
-            integracao_element = None
-            for selector in integracao_selectors:
-                try:
-                    integracao_element = self.page.wait_for_selector(selector, timeout=3000)
-                    if integracao_element:
-                        logger.info(f"  → Integrações encontrado: {selector}")
-                        integracao_element.click()
-                        time.sleep(2)
-                        break
-                except:
-                    continue
-            
-            if not integracao_element:
+            try:
+                wait_for_any(self.page, INTEGRACAO_SELECTORS, "Integrações").click()
+            except ReadinessTimeout:
                 logger.error(f"  ❌ Integrações não encontrado no menu")
                 return False
             
-            # Aguardar página carregar
-            self.page.wait_for_load_state("networkidle", timeout=TIMEOUT)
+            # Aguardar página de integrações ficar pronta
+            wait_for_any(self.page, CRIAR_SELECTORS, "Botão CRIAR", timeout=PAGE_TIMEOUT)
             logger.info(f"  ✅ Navegação para Integrações concluída")
             return True
             
@@ -319,52 +513,26 @@ class F360TokenScraper:
         """
         try:
             logger.info(f"  → Procurando botão CRIAR...")
-            
-            # Procurar botão CRIAR
-            criar_selectors = [
-                'button:has-text("CRIAR")',
-                'button:has-text("Criar")',
-                'a:has-text("CRIAR")',
-                'a:has-text("Criar")',
-                'button[class*="criar" i]',
-                'button[class*="create" i]',
-                '[aria-label*="criar" i]'
-            ]
-            
-            criar_found = False
-            for selector in criar_selectors:
-                try:
-                    element = self.page.wait_for_selector(selector, timeout=5000)
-                    if element:
-                        element.click()
-                        criar_found = True
-                        logger.info(f"  → Botão CRIAR clicado")
-                        break
-                except:
-                    continue
-            
-            if not criar_found:
+            try:
+                wait_for_any(self.page, CRIAR_SELECTORS, "Botão CRIAR").click()
+                logger.info(f"  → Botão CRIAR clicado")
+            except ReadinessTimeout:
                 logger.error(f"  ❌ Botão CRIAR não encontrado")
                 return False
             
             # Aguardar modal/formulário aparecer
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle", timeout=TIMEOUT)
+            wait_for_any(self.page, MODAL_SELECTORS, "Modal de criação", timeout=DIALOG_TIMEOUT)
             
             logger.info(f"  → Selecionando Webhook API Pública 360...")
             
             # Procurar e selecionar "Webhook API Pública 360"
             # Pode ser um select, dropdown ou radio button
-            webhook_selectors = [
-                'select option:has-text("Webhook API Pública 360")',
-                'select option:has-text("webhook API pública 360")',
-                'select option:has-text("API Pública 360")',
-                'text=/webhook.*api.*pública.*360/i',
-                'text=/api.*pública.*360/i'
-            ]
-            
             webhook_found = False
             
+            # A seleção cria o webhook: só respostas a partir daqui podem trazer o token
+            if self.capture:
+                self.capture.arm()
+            
             # Tentar via select
             try:
                 select_element = self.page.query_selector('select')
@@ -376,27 +544,26 @@ class F360TokenScraper:
             except:
                 pass
             
-            # Se não encontrou via select, tentar outros métodos
+            # Se não encontrou via select, tentar clicar em elemento com texto
             if not webhook_found:
-                # Tentar clicar em elemento com texto
-                for selector in webhook_selectors:
-                    try:
-                        element = self.page.wait_for_selector(selector, timeout=3000)
-                        if element:
-                            element.click()
-                            webhook_found = True
-                            logger.info(f"  → Webhook selecionado via clique")
-                            break
-                    except:
-                        continue
+                try:
+                    wait_for_any(self.page, WEBHOOK_SELECTORS, "Opção Webhook API Pública 360", timeout=3000).click()
+                    webhook_found = True
+                    logger.info(f"  → Webhook selecionado via clique")
+                except ReadinessTimeout:
+                    pass
             
             if not webhook_found:
                 logger.error(f"  ❌ Webhook API Pública 360 não encontrado")
                 return False
             
-            # Aguardar token ser gerado
-            time.sleep(2)
-            self.page.wait_for_load_state("networkidle", timeout=TIMEOUT)
+            # Aguardar diálogo com o token (desnecessário se a resposta de rede já o trouxe)
+            if not (self.capture and self.capture.token()):
+                try:
+                    wait_for_any(self.page, TOKEN_DIALOG_SELECTORS, "Diálogo do token", timeout=DIALOG_TIMEOUT)
+                except ReadinessTimeout as e:
+                    # extract_token ainda varre a página inteira como fallback
+                    logger.warning(f"  ⚠️  {str(e)}")
             
             logger.info(f"  ✅ Webhook criado")
             return True
@@ -410,44 +577,32 @@ class F360TokenScraper:
         Passo 6: Copiar o token gerado
         """
         try:
-            logger.info(f"  → Procurando token...")
+            # Primeiro, ler o token da resposta JSON da criação (sem tocar no DOM)
+            token = self.capture.token() if self.capture else None
+            if token:
+                logger.info(f"  ✅ Token capturado da resposta de rede: {token[:8]}...{token[-8:]}")
+                return token
             
-            # Aguardar token aparecer na página
-            time.sleep(2)
+            logger.info(f"  → Token não veio na resposta de rede, procurando no DOM...")
             
             # Procurar token em vários lugares possíveis
-            token_selectors = [
-                'input[readonly][value*="-"]',
-                'input[readonly]',
-                'code',
-                'pre',
-                '[class*="token"]',
-                '[id*="token"]',
-                '[data-token]',
-                'span[class*="token"]',
-                'div[class*="token"]'
-            ]
-            
-            token = None
             
             # Primeiro, tentar encontrar em inputs readonly (mais comum)
-            for selector in token_selectors:
+            for selector in TOKEN_SELECTORS:
                 try:
                     elements = self.page.query_selector_all(selector)
                     for element in elements:
                         text = element.get_attribute('value') or element.inner_text() or element.text_content()
                         if text:
                             # Procurar padrão de UUID/GUID (formato comum de tokens)
-                            import re
-                            # Padrão UUID: 8-4-4-4-12 caracteres hexadecimais
-                            match = re.search(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', text, re.IGNORECASE)
+                            match = UUID_RE.search(text)
                             if match:
                                 token = match.group(0)
                                 logger.info(f"  ✅ Token encontrado: {token[:8]}...{token[-8:]}")
                                 return token
                             
                             # Também procurar tokens longos sem hífens
-                            match = re.search(r'[0-9a-f]{32,}', text, re.IGNORECASE)
+                            match = HEX_TOKEN_RE.search(text)
                             if match and len(match.group(0)) >= 32:
                                 token = match.group(0)
                                 logger.info(f"  ✅ Token encontrado (sem hífens): {token[:8]}...{token[-8:]}")
@@ -459,9 +614,8 @@ class F360TokenScraper:
             if not token:
                 try:
                     page_content = self.page.content()
-                    import re
                     # Procurar UUID
-                    match = re.search(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', page_content, re.IGNORECASE)
+                    match = UUID_RE.search(page_content)
                     if match:
                         token = match.group(0)
                         logger.info(f"  ✅ Token encontrado no HTML: {token[:8]}...{token[-8:]}")
@@ -496,13 +650,28 @@ class F360TokenScraper:
         logger.info(f"{'='*60}")
         
         try:
-            # Passo 1: Login
-            if not self.login(email, senha):
-                return False, None
-            
-            # Passo 2 e 3: Navegar até Integrações
-            if not self.navigate_to_integrations():
-                return False, None
+            # Contexto isolado por cliente, autenticado se houver sessão válida em cache
+            storage_state = self.session_cache.get(email)
+            self.open_context(storage_state=storage_state)
+            
+            autenticado = False
+            if storage_state:
+                logger.info(f"  → Sessão em cache encontrada, pulando login...")
+                autenticado = self.restore_session()
+                if not autenticado:
+                    logger.info(f"  → Sessão expirada no F360, invalidando cache e refazendo login...")
+                    self.session_cache.invalidate(email)
+                    self.open_context()
+            
+            if not autenticado:
+                # Passo 1: Login
+                if not self.login(email, senha):
+                    return False, None
+                self.session_cache.save(email, self.context.storage_state())
+                
+                # Passo 2 e 3: Navegar até Integrações
+                if not self.navigate_to_integrations():
+                    return False, None
             
             # Passo 4 e 5: Criar webhook
             if not self.create_webhook():
@@ -520,253 +689,30 @@ class F360TokenScraper:
             logger.error(f"  ❌ Erro ao processar cliente: {str(e)}")
             return False, None
     
-    def read_csv(self) -> List[Dict]:
-        """Lê o arquivo CSV e retorna lista de clientes"""
-        clientes = []
-        
-        try:
-            with open(CSV_PATH, 'r', encoding='utf-8-sig') as f:
-                lines = f.readlines()
-                
-                # Encontrar a linha de cabeçalho (linha com "Login")
-                header_line_idx = None
-                for i, line in enumerate(lines):
-                    if 'Login' in line and 'Senha' in line:
-                        header_line_idx = i
-                        break
-                
-                if header_line_idx is None:
-                    logger.error("Cabeçalho do CSV não encontrado!")
-                    return []
-                
-                # Ler a partir da linha de cabeçalho
-                f.seek(0)
-                reader = csv.DictReader(
-                    f.readlines()[header_line_idx:],
-                    delimiter=';',
-                    fieldnames=None
-                )
-                
-                # Ler novamente com o reader correto
-                f.seek(0)
-                all_lines = f.readlines()
-                header_line = all_lines[header_line_idx].strip()
-                header = [h.strip() for h in header_line.split(';')]
-                
-                # Processar linhas de dados
-                for i in range(header_line_idx + 1, len(all_lines)):
-                    line = all_lines[i].strip()
-                    if not line or line.startswith('Infomações'):
-                        continue
-                    
-                    values = [v.strip() for v in line.split(';')]
-                    if len(values) < 2 or not values[1]:  # Login vazio
-                        continue
-                    
-                    # Criar dicionário
-                    cliente = {}
-                    for j, key in enumerate(header):
-                        if j < len(values):
-                            cliente[key] = values[j]
-                        else:
-                            cliente[key] = ''
-                    
-                    # Normalizar nomes das colunas (case-insensitive)
-                    normalized_cliente = {}
-                    for key, value in cliente.items():
-                        normalized_key = key.strip()
-                        if 'login' in normalized_key.lower():
-                            normalized_cliente['Login'] = value
-                        elif 'senha' in normalized_key.lower():
-                            normalized_cliente['Senha'] = value
-                        elif 'razão' in normalized_key.lower() or 'razao' in normalized_key.lower():
-                            normalized_cliente['Razão Social'] = value
-                        elif 'cnpj' in normalized_key.lower():
-                            normalized_cliente['CNPJ'] = value
-                        elif 'unidade' in normalized_key.lower():
-                            normalized_cliente['Unidade'] = value
-                        elif 'grupo' in normalized_key.lower():
-                            normalized_cliente['Grupo'] = value
-                        else:
-                            normalized_cliente[normalized_key] = value
-                    
-                    clientes.append(normalized_cliente)
-            
-            logger.info(f"Total de clientes encontrados: {len(clientes)}")
-            return clientes
-            
-        except Exception as e:
-            logger.error(f"Erro ao ler CSV: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-            return []
-    
-    def update_csv(self, clientes: List[Dict], tokens: Dict[str, str]):
-        """Atualiza o CSV com os tokens"""
-        try:
-            # Ler arquivo original mantendo estrutura
-            lines = []
-            header_line_idx = None
-            
-            with open(CSV_PATH, 'r', encoding='utf-8-sig') as f:
-                lines = f.readlines()
-                
-                # Encontrar linha de cabeçalho
-                for i, line in enumerate(lines):
-                    if 'Login' in line and 'Senha' in line:
-                        header_line_idx = i
-                        break
-                
-                if header_line_idx is None:
-                    logger.error("Cabeçalho não encontrado para atualização!")
-                    return
-            
-            # Processar cabeçalho
-            header_line = lines[header_line_idx].strip()
-            header = [h.strip() for h in header_line.split(';')]
-            
-            # Adicionar coluna Token se não existir
-            if 'Token' not in header:
-                header.append('Token')
-                header_line = ';'.join(header)
-            
-            # Criar mapeamento de login para índice de linha
-            login_to_line_idx = {}
-            for i, cliente in enumerate(clientes):
-                login = cliente.get('Login', '').strip()
-                if login:
-                    login_to_line_idx[login] = i + header_line_idx + 1  # +1 porque header_line_idx é 0-based
-            
-            # Atualizar linhas de dados
-            updated_lines = lines[:header_line_idx]  # Manter linhas antes do cabeçalho
-            updated_lines.append(header_line + '\n')  # Adicionar cabeçalho atualizado
-            
-            # Processar linhas de dados
-            for i in range(header_line_idx + 1, len(lines)):
-                line = lines[i].strip()
-                if not line:
-                    updated_lines.append('\n')
-                    continue
-                
-                values = [v.strip() for v in line.split(';')]
-                
-                # Buscar token correspondente
-                token = ''
-                if len(values) > 1:  # Tem pelo menos Login
-                    login = values[1] if len(values) > 1 else ''
-                    token = tokens.get(login, '')
-                
-                # Adicionar/atualizar coluna Token
-                if len(values) == len(header) - 1:
-                    # Adicionar token
-                    values.append(token)
-                elif len(values) >= len(header):
-                    # Atualizar token na última posição
-                    values[-1] = token
-                else:
-                    # Preencher colunas faltantes
-                    while len(values) < len(header) - 1:
-                        values.append('')
-                    values.append(token)
-                
-                updated_lines.append(';'.join(values) + '\n')
-            
-            # Escrever arquivo atualizado
-            with open(CSV_PATH, 'w', encoding='utf-8-sig', newline='') as f:
-                f.writelines(updated_lines)
-            
-            logger.info(f"CSV atualizado com sucesso!")
-            
-        except Exception as e:
-            logger.error(f"Erro ao atualizar CSV: {str(e)}")
-            import traceback
-            logger.error(traceback.format_exc())
-            raise
-    
-    def save_results(self):
-        """Salva relatório de resultados"""
-        try:
-            with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
-                f.write("="*60 + "\n")
-                f.write("RELATÓRIO DE PROCESSAMENTO F360 TOKENS\n")
-                f.write("="*60 + "\n\n")
-                f.write(f"Data: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-                
-                sucessos = sum(1 for r in self.results if r['success'])
-                falhas = len(self.results) - sucessos
-                
-                f.write(f"Total processado: {len(self.results)}\n")
-                f.write(f"Sucessos: {sucessos}\n")
-                f.write(f"Falhas: {falhas}\n\n")
-                
-                f.write("="*60 + "\n")
-                f.write("DETALHES POR CLIENTE\n")
-                f.write("="*60 + "\n\n")
-                
-                for result in self.results:
-                    status = "✅ SUCESSO" if result['success'] else "❌ FALHA"
-                    f.write(f"{status} - {result['razao_social']}\n")
-                    f.write(f"  CNPJ: {result['cnpj']}\n")
-                    f.write(f"  Login: {result['login']}\n")
-                    if result['success']:
-                        f.write(f"  Token: {result['token']}\n")
-                    else:
-                        f.write(f"  Erro: {result.get('error', 'Desconhecido')}\n")
-                    f.write("\n")
-            
-            logger.info(f"Relatório salvo em: {RESULTS_FILE}")
-            
-        except Exception as e:
-            logger.error(f"Erro ao salvar resultados: {str(e)}")
+    def process_all(self, clientes: List[Dict]) -> Dict[str, str]:
+        """Processa todos os clientes (sequencial ou pool de workers) e retorna login -> token"""
+        if self.workers > 1:
+            return self.run_parallel(clientes)
+        return self.run_sequential(clientes)
     
-    def run(self):
-        """Executa o processo completo"""
-        logger.info("="*60)
-        logger.info("F360 TOKEN SCRAPER - INICIANDO")
-        logger.info("="*60)
-        
-        # Ler clientes do CSV
-        clientes = self.read_csv()
-        if not clientes:
-            logger.error("Nenhum cliente encontrado no CSV!")
-            return
-        
-        # Criar backup do CSV
-        try:
-            import shutil
-            shutil.copy2(CSV_PATH, CSV_BACKUP_PATH)
-            logger.info(f"Backup criado: {CSV_BACKUP_PATH}")
-        except Exception as e:
-            logger.warning(f"Não foi possível criar backup: {str(e)}")
+    def run_sequential(self, clientes: List[Dict]) -> Dict[str, str]:
+        """Processa os clientes em sequência com um único navegador/página"""
+        tokens = {}
         
-        # Inicializar navegador
         with sync_playwright() as playwright:
             self.setup_browser(playwright)
             
-            tokens = {}
-            
             try:
                 # Processar cada cliente
                 for i, cliente in enumerate(clientes, 1):
                     logger.info(f"\n[{i}/{len(clientes)}] Processando cliente...")
                     
                     success, token = self.process_client(cliente)
-                    
-                    login = cliente.get('Login', '').strip()
-                    razao_social = cliente.get('Razão Social', '').strip()
-                    cnpj = cliente.get('CNPJ', '').strip()
-                    
-                    self.results.append({
-                        'success': success,
-                        'login': login,
-                        'razao_social': razao_social,
-                        'cnpj': cnpj,
-                        'token': token if success else None,
-                        'error': None if success else 'Falha no processamento'
-                    })
+                    result = self.record_result(cliente, success, token)
+                    self.results.append(result)
                     
                     if success and token:
-                        tokens[login] = token
+                        tokens[result['login']] = token
                     
                     # Aguardar entre clientes (exceto o último)
                     if i < len(clientes):
@@ -776,24 +722,100 @@ class F360TokenScraper:
             finally:
                 self.teardown_browser()
         
-        # Atualizar CSV com tokens
-        if tokens:
-            logger.info(f"\nAtualizando CSV com {len(tokens)} tokens...")
-            self.update_csv(clientes, tokens)
+        return tokens
+    
+    def run_parallel(self, clientes: List[Dict]) -> Dict[str, str]:
+        """
+        Processa os clientes com um pool de workers.
         
-        # Salvar relatório
-        self.save_results()
+        Cada worker roda em sua própria thread com instância Playwright,
+        navegador e contexto isolados (a API sync não pode ser compartilhada
+        entre threads) e consome clientes de uma fila compartilhada. Os
+        resultados de cada worker são mesclados em self.results na ordem
+        original do CSV.
+        """
+        total = len(clientes)
+        num_workers = min(self.workers, total)
+        logger.info(f"Iniciando pool com {num_workers} workers para {total} clientes...")
         
-        # Resumo final
-        logger.info("\n" + "="*60)
-        logger.info("PROCESSAMENTO CONCLUÍDO")
-        logger.info("="*60)
-        sucessos = sum(1 for r in self.results if r['success'])
-        falhas = len(self.results) - sucessos
-        logger.info(f"Total: {len(self.results)}")
-        logger.info(f"Sucessos: {sucessos}")
-        logger.info(f"Falhas: {falhas}")
-        logger.info(f"Relatório salvo em: {RESULTS_FILE}")
+        fila: "queue.Queue[Tuple[int, Dict]]" = queue.Queue()
+        for item in enumerate(clientes, 1):
+            fila.put(item)
+        
+        worker_results: Dict[int, List[Tuple[int, Dict]]] = {}
+        started: List[int] = []
+        failures: Dict[int, Exception] = {}
+        
+        def worker(worker_id: int):
+            try:
+                work(worker_id)
+            except Exception as e:
+                # guardada para a thread principal: no excepthook a falha passaria despercebida
+                logger.error(f"  ❌ [W{worker_id}] Worker encerrado: {str(e)}")
+                failures[worker_id] = e
+        
+        def work(worker_id: int):
+            # Scraper dedicado: cada worker tem seu próprio browser/context/page
+            scraper = F360TokenScraper(
+                headless=self.headless,
+                session_cache=self.session_cache,
+                blocker=self.blocker,
+                token_store=self.token_store
+            )
+            collected: List[Tuple[int, Dict]] = []
+            worker_results[worker_id] = collected
+            
+            with sync_playwright() as playwright:
+                scraper.setup_browser(playwright)
+                started.append(worker_id)
+                try:
+                    while True:
+                        try:
+                            i, cliente = fila.get_nowait()
+                        except queue.Empty:
+                            break
+                        
+                        logger.info(f"\n[W{worker_id}] [{i}/{total}] Processando cliente...")
+                        try:
+                            success, token = scraper.process_client(cliente)
+                        except Exception as e:
+                            logger.error(f"  ❌ [W{worker_id}] Erro inesperado: {str(e)}")
+                            success, token = False, None
+                        
+                        collected.append((i, self.record_result(cliente, success, token)))
+                        
+                        if not fila.empty():
+                            time.sleep(WAIT_BETWEEN_CLIENTS)
+                finally:
+                    scraper.teardown_browser()
+        
+        threads = [
+            threading.Thread(target=worker, args=(worker_id,), name=f"f360-worker-{worker_id}", daemon=True)
+            for worker_id in range(1, num_workers + 1)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        # Mesclar resultados por worker mantendo a ordem do CSV
+        merged = sorted(
+            (item for collected in worker_results.values() for item in collected),
+            key=lambda item: item[0]
+        )
+        tokens = {}
+        for _, result in merged:
+            self.results.append(result)
+            if result['success'] and result['token']:
+                tokens[result['login']] = result['token']
+        
+        logger.info(f"Pool finalizado: {len(merged)}/{total} clientes processados")
+        
+        # Nenhum navegador subiu ou sobraram clientes sem worker: interrompe run() antes de
+        # gravar relatório/CSV, como a falha de launch fazia no modo sequencial
+        if failures and (not started or not fila.empty()):
+            raise next(iter(failures.values()))
+        return tokens
 
 
 def main():
@@ -803,6 +825,19 @@ def main():
     parser = argparse.ArgumentParser(description='F360 Token Scraper')
     parser.add_argument('--headless', action='store_true', help='Executar em modo headless (sem interface gráfica)')
     parser.add_argument('--csv', type=str, help='Caminho para o arquivo CSV (opcional)')
+    parser.add_argument('--journal', type=str, help=f'Caminho do journal de checkpoint (padrão: {JOURNAL_FILE.name})')
+    parser.add_argument('--token-store', type=str, help=f'Caminho do token store SQLite (padrão: {TOKEN_STORE_FILE.name})')
+    parser.add_argument('--resume', action='store_true', help='Pular logins que já têm token no token store ou no journal')
+    parser.add_argument('--export-csv', action='store_true',
+                        help='Apenas materializar o CSV a partir do token store (sem abrir o navegador)')
+    parser.add_argument('--export-xlsx', type=str, metavar='ARQUIVO',
+                        help='Apenas exportar a lista com tokens do token store para XLSX (requer openpyxl)')
+    parser.add_argument('--session-ttl', type=int, default=SESSION_TTL,
+                        help=f'Validade em segundos das sessões em cache por login (0 desativa; padrão: {SESSION_TTL})')
+    parser.add_argument('--block-profile', choices=sorted(BLOCK_PROFILES), default=DEFAULT_BLOCK_PROFILE,
+                        help=f'Perfil de bloqueio de recursos desnecessários (padrão: {DEFAULT_BLOCK_PROFILE})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Número de workers paralelos, cada um com navegador/contexto isolado (padrão: 1 = sequencial)')
     
     args = parser.parse_args()
     
@@ -811,7 +846,24 @@ def main():
         global CSV_PATH
         CSV_PATH = Path(args.csv)
     
-    scraper = F360TokenScraper(headless=args.headless)
+    scraper = F360TokenScraper(
+        headless=args.headless,
+        workers=args.workers,
+        journal_path=Path(args.journal) if args.journal else None,
+        resume=args.resume,
+        session_cache=SessionCache(ttl=args.session_ttl),
+        blocker=RequestBlocker(args.block_profile),
+        token_store_path=Path(args.token_store) if args.token_store else None
+    )
+    
+    # Materialização sob demanda, sem rodar o navegador
+    if args.export_csv or args.export_xlsx:
+        if args.export_csv:
+            scraper.update_csv()
+        if args.export_xlsx:
+            scraper.export_xlsx(Path(args.export_xlsx))
+        return
+    
     scraper.run()
 
 
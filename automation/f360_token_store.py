@@ -0,0 +1,151 @@
+"""
+F360 Token Store - Gravação incremental e atômica dos tokens
+
+Cada token capturado é gravado na hora em um SQLite indexado por login
+(upsert O(1) por token). A lista de acessos (CSV) e a planilha XLSX são
+materializadas sob demanda a partir do store, sempre escrevendo em um
+arquivo temporário no mesmo diretório e trocando com os.replace, de forma
+que o arquivo de origem nunca fica pela metade.
+"""
+
+import csv
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from f360_csv_loader import is_header, map_columns, sniff_delimiter
+
+TOKEN_COLUMN = 'Token'
+
+
+class TokenStore:
+    """Store login -> token em SQLite (WAL), seguro para os workers do modo paralelo"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=FULL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS tokens ('
+            ' login TEXT PRIMARY KEY,'
+            ' token TEXT NOT NULL,'
+            ' updated_at TEXT NOT NULL)'
+        )
+
+    def put(self, login: str, token: str):
+        """Grava/atualiza o token do login (durável ao retornar)"""
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO tokens (login, token, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(login) DO UPDATE SET token = excluded.token, updated_at = excluded.updated_at',
+                (login, token, datetime.now().isoformat())
+            )
+
+    def tokens(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute('SELECT login, token FROM tokens'))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = 'w', **kwargs):
+    """Abre um temporário ao lado de `path` e só o troca pelo destino se tudo der certo"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix='.tmp', dir=str(path.parent))
+    try:
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)  # mantém as permissões do destino
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def iter_rows_with_tokens(source: Path, tokens: Dict[str, str]) -> Iterator[List[str]]:
+    """
+    Linhas do CSV de origem com a coluna Token preenchida.
+
+    O preâmbulo antes do cabeçalho é mantido; a coluna Token é criada se não
+    existir. Logins sem token novo mantêm o valor que já estava no arquivo.
+    """
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        header_line = None
+        preamble = []
+        for line in f:
+            if is_header(line):
+                header_line = line
+                break
+            preamble.append(line)
+        if header_line is None:
+            raise ValueError(f"Cabeçalho do CSV não encontrado em {source}")
+
+        delimiter = sniff_delimiter(header_line)
+        for values in csv.reader(preamble, delimiter=delimiter):
+            yield values
+        header = [h.strip() for h in next(csv.reader([header_line], delimiter=delimiter))]
+        if TOKEN_COLUMN not in header:
+            header.append(TOKEN_COLUMN)
+        token_idx = header.index(TOKEN_COLUMN)
+        login_idx = next(i for i, name in map_columns(header).items() if name == 'Login')
+        yield header
+
+        for values in csv.reader(f, delimiter=delimiter):
+            values = [v.strip() for v in values]
+            if not any(values):
+                yield []
+                continue
+            values += [''] * (len(header) - len(values))
+            login = values[login_idx] if login_idx < len(values) else ''
+            if login in tokens:
+                values[token_idx] = tokens[login]
+            yield values
+
+
+def detect_delimiter(source: Path) -> str:
+    with open(source, 'r', encoding='utf-8-sig', newline='') as f:
+        for line in f:
+            if is_header(line):
+                return sniff_delimiter(line)
+    raise ValueError(f"Cabeçalho do CSV não encontrado em {source}")
+
+
+def materialize_csv(source: Path, tokens: Dict[str, str], dest: Path = None):
+    """Escreve a lista de acessos com os tokens (por padrão, substitui a origem atomicamente)"""
+    dest = Path(dest or source)
+    delimiter = detect_delimiter(source)
+    with atomic_write(dest, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=delimiter, lineterminator='\n')
+        for values in iter_rows_with_tokens(source, tokens):
+            writer.writerow(values)
+
+
+def materialize_xlsx(source: Path, tokens: Dict[str, str], dest: Path):
+    """Exporta a lista de acessos com os tokens para XLSX (requer openpyxl)"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise RuntimeError("Exportação XLSX requer openpyxl: pip install openpyxl")
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Lista de acessos')
+    for values in iter_rows_with_tokens(source, tokens):
+        sheet.append(values)
+    with atomic_write(Path(dest), 'wb') as f:
+        workbook.save(f)
@@ -1,54 +1,68 @@
 import os
-import csv
+import sys
 import json
 import re
 from pathlib import Path
 from playwright.sync_api import sync_playwright
 
+# módulos compartilhados com o scraper principal (automation/ na raiz do repo)
+AUTOMATION_DIR = Path(os.environ.get(
+    "F360_AUTOMATION_DIR",
+    Path(__file__).resolve().parent.parent.parent.parent.parent / "automation",
+))
+sys.path.insert(0, str(AUTOMATION_DIR))
+from f360_coordinator import (  # noqa: E402
+    LEASE_TTL as DEFAULT_LEASE_TTL, LeaseLost, default_worker_id, open_lease_store,
+)
+from f360_csv_loader import iter_clients  # noqa: E402
+from f360_request_blocking import RequestBlocker  # noqa: E402
+from f360_token_capture import ResponseTokenCapture  # noqa: E402
+
 CSV_PATH = os.environ.get("CSV_PATH", "/tmp/F360_Lista_Acessos_COMPLETA.csv")
 OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "agents_py"
 F360_URL = "https://financas.f360.com.br"
-LIMIT = int(os.environ.get("LIMIT", "10"))
-OFFSET = int(os.environ.get("OFFSET", "0"))
+# lease store compartilhado pelos workers: arquivo SQLite local ou URL do `f360_coordinator.py serve`
+COORDINATOR = os.environ.get("COORDINATOR", str(OUTPUT_DIR / "leases.sqlite3"))
+LEASE_TTL = int(os.environ.get("LEASE_TTL", DEFAULT_LEASE_TTL))
+WORKER_ID = os.environ.get("WORKER_ID", default_worker_id())
 WEB_NAME = os.environ.get("WEB_NAME", "TORRE")
 WEB_TYPE = os.environ.get("WEB_TYPE", "API Pública da F360")
+BLOCK_PROFILE = os.environ.get("BLOCK_PROFILE", "safe")
 TOKEN_RE = re.compile(r"[A-Za-z0-9_\-]{24,}")
 
 def log(msg):  # minimal logger
     print(f"[PY] {msg}", flush=True)
 
 def read_csv():
-    rows = []
-    with open(CSV_PATH, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            login = (r.get("Login") or r.get("login") or r.get("Email") or r.get("email") or "").strip()
-            senha = (r.get("Senha") or r.get("senha") or r.get("Password") or r.get("password") or "").strip()
-            cnpj = (r.get("CNPJ") or r.get("cnpj") or "").strip()
-            empresa = (r.get("Empresa") or r.get("empresa") or r.get("Razao Social") or r.get("Razão Social") or r.get("Nome Fantasia") or r.get("Nome") or r.get("Cliente") or "").strip()
-            if login and senha:
-                rows.append({"login": login, "senha": senha, "cnpj": cnpj, "empresa": empresa})
-    return rows
-
-def extract_token(page):
-    # try structured nodes
-    for sel in ["code", "pre", "input", "textarea", "span", "div"]:
-        els = page.locator(sel)
-        count = els.count()
-        for i in range(min(count, 200)):
-            txt = (els.nth(i).input_value() if sel in ["input", "textarea"] else els.nth(i).inner_text(timeout=100)).strip()
-            if not txt:
-                continue
-            m = TOKEN_RE.search(txt)
-            if m:
-                return m.group(0)
-    # fallback full text
-    body = page.locator("body").inner_text(timeout=1000)
-    m = TOKEN_RE.search(body or "")
-    return m.group(0) if m else None
-
-def process_one(page, rec, idx, total):
-    log(f"[{idx+1}/{total}] {rec['login']}")
+    # loader compartilhado (streaming, delimitador/cabeçalho detectados em uma passada)
+    return (c for c in iter_clients(CSV_PATH) if c.senha)
+
+def to_rec(client):
+    return {"login": client["Login"], "senha": client["Senha"], "cnpj": client["CNPJ"], "empresa": client["Razão Social"]}
+
+# coleta, em um único evaluate, os textos dos nós candidatos (mesma ordem/limite da varredura anterior)
+DOM_TEXTS_JS = """(sels) => sels.flatMap(sel =>
+    Array.from(document.querySelectorAll(sel)).slice(0, 200).map(el =>
+        (el.tagName === 'INPUT' || el.tagName === 'TEXTAREA') ? el.value : el.innerText
+    )
+).concat([document.body ? document.body.innerText : ''])"""
+
+def extract_token(page, capture):
+    # resposta JSON da criação do webhook (zero round-trips no DOM)
+    token = capture.token()
+    if token:
+        return token
+    # fallback: nós estruturados + texto completo do body
+    for txt in page.evaluate(DOM_TEXTS_JS, ["code", "pre", "input", "textarea", "span", "div"]):
+        m = TOKEN_RE.search((txt or "").strip())
+        if m:
+            return m.group(0)
+    return None
+
+def process_one(page, capture, rec, idx, keep_lease):
+    # keep_lease() entre as etapas renova o lease: um cliente lento não é re-entregue a outro worker
+    log(f"[{idx+1}] {rec['login']}")
+    capture.reset()
     page.goto(F360_URL, wait_until="domcontentloaded")
     # email
     email = rec["login"]
@@ -58,6 +72,7 @@ def process_one(page, rec, idx, total):
     # login button
     page.get_by_role("button", name=re.compile("entrar|login|acessar", re.I)).first.click(timeout=3000)
     page.wait_for_timeout(5000)
+    keep_lease()
     # go to webservice
     page.goto(f"{F360_URL}/Webservice", wait_until="domcontentloaded")
     page.wait_for_timeout(1500)
@@ -87,13 +102,15 @@ def process_one(page, rec, idx, total):
             break
     if not filled and inputs.count() > 0:
         inputs.first.fill(WEB_NAME)
-    # save
+    keep_lease()
+    # save: cria o webhook, só respostas a partir daqui podem trazer o token
+    capture.arm()
     page.get_by_text(re.compile("salvar|gravar|save", re.I)).first.click(timeout=3000)
     # token
     token = None
     for i in range(5):
         page.wait_for_timeout(1000 * (i + 1))
-        token = extract_token(page)
+        token = extract_token(page, capture)
         if token:
             break
     if not token:
@@ -102,32 +119,56 @@ def process_one(page, rec, idx, total):
 
 def main():
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    rows = read_csv()
-    start = min(OFFSET, max(0, len(rows) - 1))
-    end = min(start + LIMIT, len(rows))
-    batch = rows[start:end]
-    log(f"Lidos: {len(rows)}. Processando: {len(batch)} (OFFSET={OFFSET}, LIMIT={LIMIT})")
+    leases = open_lease_store(COORDINATOR)
+    if hasattr(leases, "seed"):
+        # store local: o primeiro worker carrega a lista, os demais não duplicam nada
+        leases.seed(read_csv())
+    log(f"Worker {WORKER_ID} no coordenador {COORDINATOR}: {leases.status()}")
 
     results = []
+    blocker = RequestBlocker(BLOCK_PROFILE)
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True, args=["--no-sandbox", "--disable-dev-shm-usage"])
         ctx = browser.new_context()
+        blocker.install(ctx)
         page = ctx.new_page()
+        capture = ResponseTokenCapture(page)
         try:
-            for i, rec in enumerate(batch):
+            # um cliente por lease até a fila esvaziar; lease vencido volta para outro worker
+            while True:
+                leased = leases.acquire(WORKER_ID, 1, LEASE_TTL)
+                if not leased:
+                    break
+                rec = to_rec(leased[0])
+
+                def keep_lease(login=rec["login"]):
+                    if not leases.renew(WORKER_ID, login, LEASE_TTL):
+                        raise LeaseLost(f"lease de {login} venceu")
+
                 try:
-                    token = process_one(page, rec, i, len(batch))
+                    token = process_one(page, capture, rec, len(results), keep_lease)
                     results.append({**rec, "status": "success", "token": token})
+                    leases.complete(WORKER_ID, rec["login"], token=token)
+                except LeaseLost as e:
+                    # o cliente já voltou para a fila: o resultado é do novo dono
+                    log(f"  {e}; cliente abandonado")
+                    page = ctx.new_page()
+                    capture = ResponseTokenCapture(page)
                 except Exception as e:
                     results.append({**rec, "status": "error", "token": None, "errorMessage": str(e)})
+                    leases.complete(WORKER_ID, rec["login"], error=str(e))
                     page = ctx.new_page()  # reset page for next iteration
+                    capture = ResponseTokenCapture(page)
         finally:
             browser.close()
 
-    out = OUTPUT_DIR / "tokens_agent_playwright.json"
+    out = OUTPUT_DIR / f"tokens_agent_playwright_{WORKER_ID.replace(':', '_')}.json"
     out.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
     ok = sum(1 for r in results if r.get("status") == "success")
     log(f"Concluído: {ok}/{len(results)} com token. Saída: {out}")
+    log(blocker.summary())
+    log(f"Coordenador: {leases.status()}")
+    leases.close()
 
 if __name__ == "__main__":
     main()
@@ -2,12 +2,11 @@
 set -euo pipefail
 cd "$(dirname "$0")"
 mkdir -p output
-LOG="output/automation-py.log"
-touch "$LOG"
-LIMIT="${LIMIT:-106}"
-OFFSET="${OFFSET:-106}"
-export CSV_PATH="/tmp/F360_Lista_Acessos_COMPLETA.csv"
-export LIMIT OFFSET
+# N workers compartilhando o mesmo lease store (sem OFFSET/LIMIT: cada um pede o próximo cliente livre)
+AGENTS="${AGENTS:-2}"
+export CSV_PATH="${CSV_PATH:-/tmp/F360_Lista_Acessos_COMPLETA.csv}"
+# arquivo SQLite local ou URL de `python automation/f360_coordinator.py serve` (workers em outras máquinas)
+export COORDINATOR="${COORDINATOR:-$PWD/output/agents_py/leases.sqlite3}"
 if ! command -v python3 >/dev/null 2>&1; then
   echo "python3 não encontrado"; exit 1
 fi
@@ -17,7 +16,17 @@ if [ -d ".venv" ]; then
   . .venv/bin/activate || true
 fi
 PY_BIN="${PY_BIN:-python3}"
-setsid "$PY_BIN" agents/agent-playwright.py >> "$LOG" 2>&1 < /dev/null &
-echo "PY started (PID $!), OFFSET=$OFFSET LIMIT=$LIMIT, LOG=$LOG"
-
-
+AUTOMATION_DIR="${F360_AUTOMATION_DIR:-$(cd ../../.. && pwd)/automation}"
+case "$COORDINATOR" in
+  http://*|https://*) ;;
+  *)
+    mkdir -p "$(dirname "$COORDINATOR")"
+    "$PY_BIN" "$AUTOMATION_DIR/f360_coordinator.py" seed --db "$COORDINATOR" --csv "$CSV_PATH"
+    ;;
+esac
+for i in $(seq 1 "$AGENTS"); do
+  LOG="output/automation-py-$i.log"
+  touch "$LOG"
+  setsid "$PY_BIN" agents/agent-playwright.py >> "$LOG" 2>&1 < /dev/null &
+  echo "PY $i started (PID $!), COORDINATOR=$COORDINATOR, LOG=$LOG"
+done